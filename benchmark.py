@@ -0,0 +1,288 @@
+"""Reproducible end-to-end benchmark of the screening pipeline against local mock servers.
+
+    python benchmark.py --resumes 40 --latency 0.2 --error-rate 0.05 --out bench.json
+    python benchmark.py --baseline bench.json   # exit 1 if throughput or p95 regressed
+
+Nothing leaves the machine: the Fireworks, Zoom and SMTP endpoints are pointed at the servers
+in mock_servers.py through their environment variables, and every cache and store is written
+to a temporary directory.
+"""
+from typing import Dict, List, Optional
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import resource
+import tempfile
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import pytz
+
+import mock_servers
+
+ROLE = "Backend_Engineer"
+REGRESSION_TOLERANCE = 0.2
+CORPUS_SEED = 7
+
+SKILLS = [
+    "Python", "Django", "Flask", "FastAPI", "Node.js", "Express", "Java", "Spring Boot", "PostgreSQL", "MySQL",
+    "MongoDB", "Redis", "Docker", "Kubernetes", "AWS", "GCP", "REST APIs", "GraphQL", "microservices", "Kafka",
+    "RabbitMQ", "CI/CD", "Terraform", "React", "TypeScript", "PyTorch", "pandas", "Linux", "Git", "unit testing",
+]
+VERBS = ["Built", "Designed", "Maintained", "Scaled", "Migrated", "Optimized", "Led", "Automated", "Shipped"]
+OBJECTS = ["payment services", "a search API", "data pipelines", "internal tooling", "the billing platform",
+           "an event-driven order system", "observability dashboards", "a multi-tenant SaaS backend"]
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile; `q` in 0-100."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * q // 100))
+    return ordered[int(rank) - 1]
+
+def summarize(values: List[float]) -> Dict[str, float]:
+    return {
+        "count": len(values),
+        "mean": round(sum(values) / len(values), 4) if values else 0.0,
+        "p50": round(percentile(values, 50), 4),
+        "p95": round(percentile(values, 95), 4),
+        "p99": round(percentile(values, 99), 4),
+    }
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+def make_pdf(pages: List[List[str]]) -> bytes:
+    """A minimal text PDF, one Helvetica text object per page."""
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for lines in pages:
+        stream = "BT /F1 10 Tf 12 TL 50 760 Td " + " ".join(f"({_escape(line)}) '" for line in lines) + " ET"
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents {len(objects)} 0 R "
+                       "/Resources << /Font << /F1 3 0 R >> >> >>")
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>"
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("latin-1")
+    out += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode("latin-1")
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode("latin-1")
+    return bytes(out)
+
+def make_resume(rng: random.Random, index: int, pages: int) -> bytes:
+    skills = rng.sample(SKILLS, rng.randint(4, 12))
+    content = [[
+        f"Candidate {index:04d}", f"candidate{index:04d}@example.com | +1 555 {index:04d}", "",
+        "Summary", f"Engineer with {rng.randint(1, 12)} years of experience.", "",
+        "Skills", ", ".join(skills), "", "Experience",
+    ]]
+    for page in range(pages):
+        lines = content[page] if page < len(content) else []
+        while len(lines) < 55:
+            lines.append(f"- {rng.choice(VERBS)} {rng.choice(OBJECTS)} using {rng.choice(skills)} "
+                         f"and {rng.choice(skills)} for {rng.randint(2, 40)} teams.")
+        if page >= len(content):
+            content.append(lines)
+    return make_pdf(content)
+
+def generate_corpus(count: int, max_pages: int, seed: int = CORPUS_SEED) -> List[tuple]:
+    """(name, bytes) resumes; page counts are spread from 1 to `max_pages` so both extractors run."""
+    rng = random.Random(seed)
+    return [(f"resume_{i:04d}.pdf", make_resume(rng, i, 1 + i % max_pages)) for i in range(count)]
+
+@contextmanager
+def timed(samples: Dict[str, List[float]], stage: str):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        samples.setdefault(stage, []).append(time.perf_counter() - started)
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024, 1)
+
+def reset_caches() -> None:
+    import compaction
+    import pdf_extraction
+
+    pdf_extraction.text_cache.clear()
+    compaction.compact_resume.cache_clear()
+
+def run_single(pipeline, corpus, company: str) -> Dict:
+    """One candidate at a time through extraction, analysis, confirmation email and Zoom scheduling."""
+    samples: Dict[str, List[float]] = {}
+    start_time = datetime.now(pytz.timezone("Asia/Kolkata")) + timedelta(days=1)
+    started = time.perf_counter()
+    for name, data in corpus:
+        with timed(samples, "total"):
+            with timed(samples, "extract_text_from_pdf"):
+                text = pipeline.extract_text_from_pdf(data)
+            with timed(samples, "analyze_resume_dobby"):
+                pipeline.analyze_resume_dobby(text, ROLE, "bench-key", company)
+            with timed(samples, "send_email"):
+                pipeline.send_email("recruiter@example.com", "app-password", f"{name}@example.com",
+                                    "Application received", "Thanks for applying.")
+            with timed(samples, "get_zoom_access_token"):
+                token = pipeline.get_zoom_access_token("account", "client", "secret")
+            with timed(samples, "schedule_zoom_meeting"):
+                pipeline.schedule_zoom_meeting(token, f"Interview {name}", start_time)
+    wall = time.perf_counter() - started
+    return {"wall_seconds": round(wall, 3), "throughput_per_second": round(len(corpus) / wall, 3),
+            "latency": {stage: summarize(values) for stage, values in samples.items()}}
+
+def run_batch(pipeline, corpus, company: str, concurrency: int) -> Dict:
+    """`screen_resumes_batch` over the whole corpus, then one pooled bulk send of the outcome emails."""
+    import mailer
+
+    started = time.perf_counter()
+    rows = list(pipeline.screen_resumes_batch(corpus, ROLE, "bench-key", company, concurrency, min_score=None))
+    screened = time.perf_counter() - started
+    messages = [mailer.build_message("recruiter@example.com", f"{row['File']}@example.com",
+                                     "Application update", row["Feedback"]) for row in rows]
+    sent_started = time.perf_counter()
+    outcomes = mailer.send_bulk(mailer.get_pool("recruiter@example.com", "app-password"), messages)
+    sending = time.perf_counter() - sent_started
+    return {
+        "wall_seconds": round(screened + sending, 3),
+        "throughput_per_second": round(len(rows) / screened, 3),
+        "emails_per_second": round(len(outcomes) / sending, 3) if sending else 0.0,
+        "emails_failed": sum(not outcome["sent"] for outcome in outcomes),
+        "latency": {"time_to_result": summarize([row["Seconds"] for row in rows])},
+    }
+
+def measure(mode: str, run, trace_memory: bool) -> Dict:
+    if trace_memory:
+        tracemalloc.start()
+    try:
+        result = run()
+        if trace_memory:
+            result["python_heap_peak_mb"] = round(tracemalloc.get_traced_memory()[1] / (1024 * 1024), 1)
+    finally:
+        if trace_memory:
+            tracemalloc.stop()
+    result["rss_peak_mb"] = peak_rss_mb()
+    return {"mode": mode, **result}
+
+def regressions(report: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    found = []
+    for mode, current in report["modes"].items():
+        previous = baseline.get("modes", {}).get(mode)
+        if not previous:
+            continue
+        if current["throughput_per_second"] < previous["throughput_per_second"] * (1 - tolerance):
+            found.append(f"{mode}: throughput {current['throughput_per_second']}/s "
+                         f"vs baseline {previous['throughput_per_second']}/s")
+        for stage, stats in current["latency"].items():
+            before = previous["latency"].get(stage)
+            if before and before["p95"] > 0 and stats["p95"] > before["p95"] * (1 + tolerance):
+                found.append(f"{mode}/{stage}: p95 {stats['p95']}s vs baseline {before['p95']}s")
+    return found
+
+def print_report(report: Dict) -> None:
+    for mode, result in report["modes"].items():
+        print(f"\n{mode}: {result['throughput_per_second']} resumes/s, {result['wall_seconds']}s wall, "
+              f"peak RSS {result['rss_peak_mb']} MB", file=sys.stderr)
+        print(f"  {'stage':<24}{'p50':>9}{'p95':>9}{'p99':>9}", file=sys.stderr)
+        for stage, stats in result["latency"].items():
+            print(f"  {stage:<24}{stats['p50']:>9.4f}{stats['p95']:>9.4f}{stats['p99']:>9.4f}", file=sys.stderr)
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--resumes", type=int, default=40, help="Size of the generated corpus")
+    parser.add_argument("--max-pages", type=int, default=12, help="Pages of the longest generated resume")
+    parser.add_argument("--modes", default="single,batch", help="Comma-separated: single, batch")
+    parser.add_argument("--concurrency", type=int, default=4, help="Batch-mode concurrent Dobby calls")
+    parser.add_argument("--latency", type=float, default=0.2, help="Mock chat completion latency (seconds)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of chat requests answered with 429")
+    parser.add_argument("--retry-after", type=float, default=0.0, help="Retry-After sent with each 429")
+    parser.add_argument("--fenced-rate", type=float, default=0.0, help="Share of replies wrapped in prose and fences")
+    parser.add_argument("--zoom-latency", type=float, default=0.05)
+    parser.add_argument("--smtp-latency", type=float, default=0.01)
+    parser.add_argument("--smtp-rate", type=float, default=0.0, help="SMTP pacing per account, messages/s (0 = unpaced)")
+    parser.add_argument("--dobby-rpm", type=float, default=6000,
+                        help="Client rate limit; the production default of 60/min would dominate the numbers")
+    parser.add_argument("--router-model", default="",
+                        help="Route through this small model first (the mock answers it with a random confidence)")
+    parser.add_argument("--trace-memory", action="store_true", help="Also report the tracemalloc heap peak (slower)")
+    parser.add_argument("--out", help="Write the JSON report here")
+    parser.add_argument("--baseline", help="Earlier JSON report to compare against")
+    parser.add_argument("--tolerance", type=float, default=REGRESSION_TOLERANCE)
+    parser.add_argument("--seed", type=int, default=CORPUS_SEED)
+    return parser
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    chat = mock_servers.MockChatServer(latency=args.latency, error_rate=args.error_rate,
+                                       retry_after=args.retry_after, fenced_rate=args.fenced_rate, seed=args.seed)
+    zoom = mock_servers.MockZoomServer(latency=args.zoom_latency)
+    smtp = mock_servers.SMTPSink(latency=args.smtp_latency)
+    workdir = tempfile.mkdtemp(prefix="dobby-bench-")
+    os.environ.update({
+        "DOBBY_CHAT_URL": chat.url, "DOBBY_REQUESTS_PER_MINUTE": str(args.dobby_rpm),
+        "ZOOM_TOKEN_URL": zoom.token_url, "ZOOM_API_URL": zoom.api_url,
+        "DOBBY_SMTP_HOST": smtp.host, "DOBBY_SMTP_PORT": str(smtp.port), "DOBBY_SMTP_SSL": "0",
+        "DOBBY_SMTP_RATE": str(args.smtp_rate),
+        "DOBBY_CACHE_PATH": os.path.join(workdir, "cache.sqlite3"),
+        "DOBBY_CANDIDATES_PATH": os.path.join(workdir, "candidates.sqlite3"),
+        "DOBBY_JOBS_PATH": os.path.join(workdir, "jobs.sqlite3"),
+        "DOBBY_SLOTS_PATH": os.path.join(workdir, "slots.sqlite3"),
+        "DOBBY_ROUTER_MODEL": args.router_model,
+    })
+    import pipeline
+
+    corpus = generate_corpus(args.resumes, args.max_pages, args.seed)
+    report = {
+        "started_at": datetime.now(pytz.utc).isoformat(),
+        "config": {key: value for key, value in vars(args).items() if key not in ("out", "baseline")},
+        "corpus": {"resumes": len(corpus), "bytes": sum(len(data) for _, data in corpus)},
+        "modes": {},
+    }
+    for mode in args.modes.split(","):
+        reset_caches()
+        # A fresh company name per mode keeps the analysis cache from serving one mode's results to the next.
+        company = f"Bench {mode} {report['started_at']}"
+        if mode == "single":
+            run = lambda: run_single(pipeline, corpus, company)
+        elif mode == "batch":
+            run = lambda: run_batch(pipeline, corpus, company, args.concurrency)
+        else:
+            print(f"Unknown mode: {mode}", file=sys.stderr)
+            return 2
+        report["modes"][mode] = measure(mode, run, args.trace_memory)
+    report["mock_servers"] = {
+        "chat_requests": chat.requests, "chat_429s": chat.rate_limited, "zoom_token_requests": zoom.token_requests,
+        "zoom_meetings": len(zoom.meetings), "smtp_messages": len(smtp.messages), "smtp_connections": smtp.connections,
+    }
+    pipeline.get_candidate_store().close()
+    for server in (chat, zoom, smtp):
+        server.close()
+
+    print_report(report)
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            found = regressions(report, json.load(f), args.tolerance)
+        for line in found:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if found:
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
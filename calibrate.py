@@ -0,0 +1,186 @@
+"""Offline calibration of the model routing tier against 70B-only verdicts on stored candidates.
+
+    python calibrate.py --router-model accounts/fireworks/models/llama-v3p1-8b-instruct --limit 200 --out calibration.json
+
+Every analysed candidate in the candidate store is screened again by the routing model. Its
+verdict is compared with the 70B verdict: the stored one, or a fresh one with --refresh or when
+the stored verdict came from the routing tier. The report shows, for each confidence threshold,
+how many candidates would escalate, how often the tier would agree with 70B alone, and what
+share of 70B-only spend it would cost.
+"""
+from typing import Dict, List, Optional
+import os
+import sys
+import json
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+import candidate_store
+import compaction
+import pipeline
+import telemetry
+
+DEFAULT_THRESHOLDS = "0.5,0.6,0.7,0.75,0.8,0.85,0.9,0.95"
+TARGET_AGREEMENT = 0.98
+ANALYSED_STATUSES = (candidate_store.SELECTED, candidate_store.REJECTED, candidate_store.INTERVIEW_SCHEDULED)
+DOBBY_COMPLETION_TOKENS = 200  # estimate for stored 70B verdicts, whose usage was not kept
+
+def load_corpus(role: Optional[str], limit: int) -> List[Dict]:
+    """The newest analysed candidates that still have their resume text, at most `limit`."""
+    store = pipeline.get_candidate_store()
+    summaries = []
+    for status in ANALYSED_STATUSES:
+        summaries.extend(store.list(role=role, status=status, limit=limit))
+    summaries.sort(key=lambda summary: summary["created_at"], reverse=True)
+    records = []
+    for summary in summaries[:limit]:
+        record = store.get(summary["key"])
+        analysis = record.get("analysis") or {}
+        if record.get("resume_text") and "selected" in analysis \
+                and not analysis.get("feedback", "").startswith("Error analyzing resume"):
+            records.append(record)
+    return records
+
+def measured(call) -> Dict:
+    """Run `call` inside a trace and return its value with the tokens, cost and seconds it used."""
+    started = time.perf_counter()
+    with telemetry.trace() as current:
+        value = call()
+    return {"value": value, "tokens": current["tokens"], "cost_usd": current["cost_usd"],
+            "seconds": time.perf_counter() - started}
+
+def evaluate(record: Dict, api_key: str, router_model: str, refresh: bool) -> Optional[Dict]:
+    """Both tiers' verdicts on one candidate, or None when a fresh 70B verdict could not be had."""
+    resume_text = compaction.compact_resume(record["resume_text"]).text
+    role, company = record["role"], record["company"] or ""
+    triage = measured(lambda: pipeline.triage_resume(resume_text, role, api_key, company, model=router_model))
+    stored = record["analysis"]
+    if refresh or stored.get("tier") == "router":
+        try:
+            dobby = measured(lambda: pipeline.analyze_with_dobby(resume_text, role, api_key, company))
+        except Exception as e:
+            print(f"Skipping {record['key'][:12]}: no 70B verdict ({e})", file=sys.stderr)
+            return None
+        dobby["measured"] = True
+    else:
+        prompt = pipeline.build_analysis_messages(resume_text, role, company)
+        tokens = compaction.estimate_tokens(json.dumps(prompt)) + DOBBY_COMPLETION_TOKENS
+        price = telemetry.MODEL_PRICES.get(pipeline.DOBBY_MODEL, telemetry.PRICE_PER_MILLION_TOKENS)
+        dobby = {"value": stored, "tokens": tokens, "cost_usd": tokens * price / 1_000_000, "seconds": None,
+                 "measured": False}
+    verdict = triage["value"]
+    return {
+        "key": record["key"], "role": role,
+        "dobby_selected": bool(dobby["value"]["selected"]),
+        "router_selected": None if verdict is None else bool(verdict["selected"]),
+        "router_confidence": None if verdict is None else verdict["confidence"],
+        "router_cost_usd": triage["cost_usd"], "router_seconds": triage["seconds"],
+        "dobby_cost_usd": dobby["cost_usd"], "dobby_seconds": dobby["seconds"], "dobby_measured": dobby["measured"],
+    }
+
+def mean_seconds(values: List[float]) -> Optional[float]:
+    return round(sum(values) / len(values), 3) if values else None
+
+def sweep(results: List[Dict], thresholds: List[float]) -> List[Dict]:
+    """Tier outcomes per threshold: a verdict below the threshold (or no verdict) escalates to 70B."""
+    rows = []
+    dobby_cost = sum(r["dobby_cost_usd"] for r in results) or 1e-12
+    for threshold in thresholds:
+        escalated = [r["router_confidence"] is None or r["router_confidence"] < threshold for r in results]
+        kept = [r for r, up in zip(results, escalated) if not up]
+        false_accepts = sum(r["router_selected"] and not r["dobby_selected"] for r in kept)
+        false_rejects = sum(not r["router_selected"] and r["dobby_selected"] for r in kept)
+        cost = sum(r["router_cost_usd"] for r in results) + sum(
+            r["dobby_cost_usd"] for r, up in zip(results, escalated) if up)
+        rows.append({
+            "threshold": threshold,
+            "escalation_rate": round(sum(escalated) / len(results), 4),
+            "agreement": round(1 - (false_accepts + false_rejects) / len(results), 4),
+            "false_accepts": false_accepts,
+            "false_rejects": false_rejects,
+            "cost_vs_70b_only": round(cost / dobby_cost, 4),
+        })
+    return rows
+
+def recommend(rows: List[Dict], target: float) -> Optional[float]:
+    """The threshold with the fewest escalations whose agreement meets `target`."""
+    passing = [row for row in rows if row["agreement"] >= target]
+    return min(passing, key=lambda row: (row["escalation_rate"], -row["threshold"]))["threshold"] if passing else None
+
+def print_report(report: Dict) -> None:
+    dobby_seconds = report["dobby_mean_seconds"]
+    print(f"\n{report['candidates']} candidates, routing model {report['router_model']}: "
+          f"{report['router_mean_seconds']}s mean per call vs "
+          f"{'unmeasured' if dobby_seconds is None else f'{dobby_seconds}s'} for 70B", file=sys.stderr)
+    print(f"  {'threshold':>9}{'escalated':>11}{'agreement':>11}{'false acc':>11}{'false rej':>11}{'cost':>8}",
+          file=sys.stderr)
+    for row in report["thresholds"]:
+        marker = " <- configured" if row["threshold"] == report["configured_threshold"] else ""
+        print(f"  {row['threshold']:>9.2f}{row['escalation_rate']:>11.1%}{row['agreement']:>11.1%}"
+              f"{row['false_accepts']:>11}{row['false_rejects']:>11}{row['cost_vs_70b_only']:>8.1%}{marker}",
+              file=sys.stderr)
+    recommended = report["recommended_threshold"]
+    print(f"Recommended DOBBY_ROUTER_MIN_CONFIDENCE for {report['target_agreement']:.0%} agreement: "
+          f"{recommended if recommended is not None else 'none of the thresholds tried'}", file=sys.stderr)
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--router-model", default=pipeline.ROUTER_MODEL,
+                        help="Small model to calibrate (default: $DOBBY_ROUTER_MODEL)")
+    parser.add_argument("--api-key", default=os.environ.get("DOBBY_API_KEY", ""),
+                        help="Fireworks API key (default: $DOBBY_API_KEY)")
+    parser.add_argument("--role", choices=list(pipeline.ROLE_REQUIREMENTS), help="Only candidates for this role")
+    parser.add_argument("--limit", type=int, default=200, help="Newest analysed candidates to use")
+    parser.add_argument("--refresh", action="store_true", help="Re-run 70B instead of trusting stored verdicts")
+    parser.add_argument("--concurrency", type=int, default=pipeline.DEFAULT_BATCH_CONCURRENCY)
+    parser.add_argument("--thresholds", default=DEFAULT_THRESHOLDS, help="Comma-separated confidence thresholds")
+    parser.add_argument("--target-agreement", type=float, default=TARGET_AGREEMENT,
+                        help="Agreement with 70B-only decisions the recommended threshold must reach")
+    parser.add_argument("--out", help="Write the JSON report, with per-candidate results, here")
+    return parser
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    if not args.router_model:
+        print("No routing model: pass --router-model or set DOBBY_ROUTER_MODEL.", file=sys.stderr)
+        return 2
+    if not args.api_key:
+        print("No API key: pass --api-key or set DOBBY_API_KEY.", file=sys.stderr)
+        return 2
+    corpus = load_corpus(args.role, args.limit)
+    if not corpus:
+        print(f"No analysed candidates in {candidate_store.CANDIDATE_STORE_PATH} to calibrate against.",
+              file=sys.stderr)
+        return 1
+
+    with ThreadPoolExecutor(max_workers=max(1, min(args.concurrency, pipeline.MAX_BATCH_CONCURRENCY))) as pool:
+        evaluated = pool.map(lambda record: evaluate(record, args.api_key, args.router_model, args.refresh), corpus)
+        results = [result for result in evaluated if result is not None]
+    if not results:
+        print("No candidate could be evaluated.", file=sys.stderr)
+        return 1
+    thresholds = sorted({float(value) for value in args.thresholds.split(",")} | {pipeline.ROUTER_MIN_CONFIDENCE})
+    rows = sweep(results, thresholds)
+    report = {
+        "router_model": args.router_model,
+        "dobby_model": pipeline.DOBBY_MODEL,
+        "candidates": len(results),
+        "router_failures": sum(r["router_confidence"] is None for r in results),
+        "dobby_verdicts_measured": sum(r["dobby_measured"] for r in results),
+        "router_mean_seconds": mean_seconds([r["router_seconds"] for r in results]),
+        "dobby_mean_seconds": mean_seconds([r["dobby_seconds"] for r in results if r["dobby_measured"]]),
+        "configured_threshold": pipeline.ROUTER_MIN_CONFIDENCE,
+        "target_agreement": args.target_agreement,
+        "recommended_threshold": recommend(rows, args.target_agreement),
+        "thresholds": rows,
+        "results": results,
+    }
+    print_report(report)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
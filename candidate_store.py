@@ -0,0 +1,194 @@
+"""Persistent, indexed record of every screened candidate, written in batches to SQLite (WAL mode)."""
+from typing import Dict, List, Optional
+import os
+import json
+import time
+import atexit
+import hashlib
+import logging
+import sqlite3
+import threading
+
+CANDIDATE_STORE_PATH = os.environ.get("DOBBY_CANDIDATES_PATH", ".dobby_candidates.sqlite3")
+CANDIDATE_FLUSH_INTERVAL = 0.5  # seconds a write may wait before it is committed
+CANDIDATE_FLUSH_BATCH = 200
+CANDIDATE_PAGE_SIZE = 100
+
+logger = logging.getLogger("dobby")
+
+PENDING, FILTERED, REJECTED, SELECTED, INTERVIEW_SCHEDULED = (
+    "pending", "filtered", "rejected", "selected", "interview_scheduled"
+)
+STATUSES = (PENDING, FILTERED, REJECTED, SELECTED, INTERVIEW_SCHEDULED)
+
+COLUMNS = ("email", "role", "company", "source", "status", "resume_text", "analysis", "analyzed_at")
+SUMMARY_COLUMNS = ("key", "email", "role", "company", "source", "status", "analysis", "outcomes",
+                   "created_at", "updated_at", "analyzed_at")
+
+_UPSERT = (
+    "INSERT INTO candidates (key, email, role, company, source, status, resume_text, analysis, analyzed_at, "
+    "outcomes, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+    "ON CONFLICT (key) DO UPDATE SET "
+    + ", ".join(f"{column} = COALESCE(excluded.{column}, {column})" for column in COLUMNS)
+    + ", outcomes = json_patch(outcomes, excluded.outcomes), updated_at = excluded.updated_at"
+)
+
+def candidate_key(email: str, role: str, company_name: str, resume_text: str) -> str:
+    """Stable id of one application; also the idempotency root of its side-effect jobs."""
+    return hashlib.sha256(json.dumps([email, role, company_name, resume_text]).encode("utf-8")).hexdigest()
+
+def _merge(pending: Dict, fields: Dict) -> None:
+    for name, value in fields.items():
+        if name == "outcomes":
+            outcomes = pending.setdefault("outcomes", {})
+            for step, details in value.items():
+                if isinstance(details, dict) and isinstance(outcomes.get(step), dict):
+                    outcomes[step] = {**outcomes[step], **details}
+                else:
+                    outcomes[step] = details
+        elif value is not None:
+            pending[name] = value
+
+class CandidateStore:
+    """`save` only buffers; a background thread commits buffered writes as one transaction.
+
+    Writes to the same candidate are merged before they reach the database, and
+    `outcomes` is merged key by key, so job handlers can record their step independently.
+    Reads flush first, so a caller always sees its own writes.
+    """
+
+    def __init__(self, path: str, flush_interval: float = CANDIDATE_FLUSH_INTERVAL,
+                 flush_batch: int = CANDIDATE_FLUSH_BATCH):
+        self.flush_interval = flush_interval
+        self.flush_batch = flush_batch
+        self._pending: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self.conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS candidates ("
+            "key TEXT PRIMARY KEY, email TEXT, role TEXT, company TEXT, source TEXT, status TEXT, "
+            "resume_text TEXT, analysis TEXT, analyzed_at REAL, outcomes TEXT NOT NULL DEFAULT '{}', "
+            "created_at REAL NOT NULL, updated_at REAL NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS candidates_role_created ON candidates (role, created_at)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS candidates_status_created ON candidates (status, created_at)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS candidates_created ON candidates (created_at)")
+        self.conn.commit()
+        self._thread = threading.Thread(target=self._work, daemon=True, name="candidate-writer")
+        self._thread.start()
+        atexit.register(self.close)
+
+    def save(self, key: str, **fields) -> None:
+        """Buffer an update; `analysis` and `outcomes` are dicts, None values leave a column unchanged."""
+        unknown = set(fields) - set(COLUMNS) - {"outcomes"}
+        if unknown:
+            raise ValueError(f"Unknown candidate fields: {', '.join(sorted(unknown))}")
+        with self._lock:
+            pending = self._pending.setdefault(key, {"saved_at": time.time()})
+            _merge(pending, fields)
+            full = len(self._pending) >= self.flush_batch
+        if full:
+            self._wakeup.set()
+
+    def flush(self) -> int:
+        """Commit everything buffered so far; returns the number of candidates written."""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            if not pending:
+                return 0
+            now = time.time()
+            rows = []
+            for key, fields in pending.items():
+                analysis = fields.get("analysis")
+                rows.append((
+                    key, fields.get("email"), fields.get("role"), fields.get("company"), fields.get("source"),
+                    fields.get("status"), fields.get("resume_text"),
+                    None if analysis is None else json.dumps(analysis), fields.get("analyzed_at"),
+                    json.dumps(fields.get("outcomes", {})), fields["saved_at"], now
+                ))
+            try:
+                self.conn.executemany(_UPSERT, rows)
+                self.conn.commit()
+            except sqlite3.Error:
+                self.conn.rollback()
+                self._restore(pending)
+                raise
+            return len(rows)
+
+    def _restore(self, failed: Dict[str, Dict]) -> None:
+        """Put writes from a failed flush back in the buffer, under any newer writes to the same candidates."""
+        with self._lock:
+            for key, fields in failed.items():
+                newer = self._pending.get(key)
+                if newer is not None:
+                    newer = dict(newer)
+                    newer.pop("saved_at")
+                    _merge(fields, newer)
+                self._pending[key] = fields
+
+    @staticmethod
+    def _record(row: sqlite3.Row) -> Dict:
+        record = dict(row)
+        for column in ("analysis", "outcomes"):
+            if record.get(column) is not None:
+                record[column] = json.loads(record[column])
+        return record
+
+    def get(self, key: str) -> Optional[Dict]:
+        self.flush()
+        with self._flush_lock:
+            self.conn.row_factory = sqlite3.Row
+            row = self.conn.execute("SELECT * FROM candidates WHERE key = ?", (key,)).fetchone()
+            self.conn.row_factory = None
+        return None if row is None else self._record(row)
+
+    def list(self, role: Optional[str] = None, status: Optional[str] = None, since: Optional[float] = None,
+             until: Optional[float] = None, limit: int = CANDIDATE_PAGE_SIZE, offset: int = 0) -> List[Dict]:
+        """Newest first, without the resume text; every filter is served by an index."""
+        clauses, params = [], []
+        for clause, value in (("role = ?", role), ("status = ?", status),
+                              ("created_at >= ?", since), ("created_at < ?", until)):
+            if value is not None:
+                clauses.append(clause)
+                params.append(value)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        self.flush()
+        with self._flush_lock:
+            self.conn.row_factory = sqlite3.Row
+            rows = self.conn.execute(
+                f"SELECT {', '.join(SUMMARY_COLUMNS)} FROM candidates{where} "
+                "ORDER BY created_at DESC LIMIT ? OFFSET ?", (*params, limit, offset)
+            ).fetchall()
+            self.conn.row_factory = None
+        return [self._record(row) for row in rows]
+
+    def counts(self, role: Optional[str] = None) -> Dict[str, int]:
+        self.flush()
+        with self._flush_lock:
+            if role is None:
+                rows = self.conn.execute("SELECT status, COUNT(*) FROM candidates GROUP BY status").fetchall()
+            else:
+                rows = self.conn.execute(
+                    "SELECT status, COUNT(*) FROM candidates WHERE role = ? GROUP BY status", (role,)
+                ).fetchall()
+        return dict(rows)
+
+    def close(self) -> None:
+        self._stopping.set()
+        self._wakeup.set()
+        self.flush()
+
+    def _work(self) -> None:
+        while not self._stopping.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except sqlite3.Error as e:
+                logger.warning(f"Candidate store flush failed, retrying: {e}")
@@ -0,0 +1,136 @@
+"""Normalization and token-budgeted compaction of extracted resume text before it is prompted."""
+from typing import Dict, List, NamedTuple, Optional, Tuple
+import re
+from collections import Counter
+from functools import lru_cache
+
+RESUME_TOKEN_BUDGET = 3000
+CHARS_PER_TOKEN = 4  # rough average for English prose under Llama-style tokenizers
+REPEATED_LINE_MAX_LENGTH = 80
+EDGE_LINES = 2  # lines at the top and at the bottom of a page that may be running headers/footers
+PAGE_BREAK = "\f"  # pdf_extraction joins page texts with this
+
+SECTION_HEADINGS: Dict[str, Tuple[str, ...]] = {
+    "summary": ("summary", "profile", "objective", "about me", "professional summary", "career objective"),
+    "skills": ("skills", "technical skills", "core competencies", "technologies", "tech stack", "key skills"),
+    "experience": ("experience", "work experience", "professional experience", "employment history",
+                   "work history", "employment"),
+    "projects": ("projects", "personal projects", "key projects", "academic projects"),
+    "education": ("education", "academic background", "qualifications", "academic qualifications"),
+    "certifications": ("certifications", "certificates", "licenses", "courses", "training"),
+    "achievements": ("achievements", "awards", "honors", "honours", "publications"),
+    "references": ("references", "referees"),
+    "hobbies": ("hobbies", "interests", "hobbies and interests", "extracurricular activities", "extra-curricular"),
+    "declaration": ("declaration",),
+    "personal": ("personal details", "personal information", "personal data", "personal profile"),
+}
+DROPPED_SECTIONS = {"references", "hobbies", "declaration", "personal"}
+SECTION_PRIORITY = ["header", "skills", "experience", "projects", "summary", "certifications",
+                    "achievements", "education", "other"]
+
+_HEADING_LOOKUP = {name: section for section, names in SECTION_HEADINGS.items() for name in names}
+_HYPHENATED_BREAK = re.compile(r"(\w)-\n\s*([a-z])")
+_PAGE_NUMBER = re.compile(r"^(page\s*)?\d{1,3}(\s*(/|of)\s*\d{1,3})?$", re.IGNORECASE)  # never a year
+_BULLET = re.compile(r"^[•●▪■◦‣∙·*–—-]+\s*")
+_SPACES = re.compile(r"[ \t\u00a0\u2000-\u200b]+")
+
+class CompactionResult(NamedTuple):
+    text: str
+    tokens_before: int
+    tokens_after: int
+    dropped_sections: Tuple[str, ...]
+    truncated: bool
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.tokens_before - self.tokens_after
+
+def estimate_tokens(text: str) -> int:
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+def _heading(line: str) -> Optional[str]:
+    return _HEADING_LOOKUP.get(line.lower().rstrip(":").strip())
+
+def _page_lines(page: str) -> List[str]:
+    lines = []
+    for raw in page.split("\n"):
+        line = _SPACES.sub(" ", raw).strip()
+        if _BULLET.match(line):
+            line = "- " + _BULLET.sub("", line)
+        if line:
+            lines.append(line)
+    return lines
+
+def normalize_lines(text: str) -> List[str]:
+    """Rejoin hyphenated words, collapse whitespace, and drop page numbers and running headers/footers.
+
+    Only the first and last EDGE_LINES lines of each page (pages split on PAGE_BREAK) are
+    candidates: a page number there is dropped, as is a short line already seen at the edge
+    of an earlier page. Lines in the body, such as a repeated job title or a year, are kept.
+    """
+    text = _HYPHENATED_BREAK.sub(r"\1\2", text.replace("\r\n", "\n").replace("\r", "\n"))
+    pages = [_page_lines(page) for page in text.split(PAGE_BREAK)]
+
+    def edges(page: List[str]) -> List[int]:
+        return [i for i in range(len(page)) if i < EDGE_LINES or i >= len(page) - EDGE_LINES]
+
+    repeats = Counter(key for page in pages for key in {
+        page[i].lower() for i in edges(page) if len(page[i]) <= REPEATED_LINE_MAX_LENGTH and not _heading(page[i])
+    })
+    seen = set()
+    lines = []
+    for page in pages:
+        at_edge = set(edges(page))
+        for i, line in enumerate(page):
+            if i in at_edge:
+                if _PAGE_NUMBER.match(line):
+                    continue
+                key = line.lower()
+                if repeats.get(key, 0) > 1:
+                    if key in seen:
+                        continue
+                    seen.add(key)
+            lines.append(line)
+    return lines
+
+def split_sections(lines: List[str]) -> List[Tuple[str, List[str]]]:
+    sections: List[Tuple[str, List[str]]] = [("header", [])]
+    for line in lines:
+        section = _heading(line)
+        if section:
+            sections.append((section, [line]))
+        else:
+            sections[-1][1].append(line)
+    return [(name, body) for name, body in sections if body]
+
+@lru_cache(maxsize=512)
+def compact_resume(text: str, token_budget: int = RESUME_TOKEN_BUDGET) -> CompactionResult:
+    """Normalize the text, drop non-informative sections and fit it into `token_budget`.
+
+    When over budget, sections are filled in SECTION_PRIORITY order and the lowest-priority
+    ones are cut line by line; the surviving sections keep their original order.
+    """
+    sections = split_sections(normalize_lines(text))
+    dropped = tuple(dict.fromkeys(name for name, _ in sections if name in DROPPED_SECTIONS))
+    sections = [(name, body) for name, body in sections if name not in DROPPED_SECTIONS]
+
+    rank = {name: i for i, name in enumerate(SECTION_PRIORITY)}
+    order = sorted(range(len(sections)), key=lambda i: rank.get(sections[i][0], rank["other"]))
+    remaining = token_budget * CHARS_PER_TOKEN
+    kept: Dict[int, List[str]] = {}
+    truncated = False
+    for i in order:
+        body = []
+        for line in sections[i][1]:
+            cost = len(line) + 1
+            if cost > remaining:
+                truncated = True
+                break
+            body.append(line)
+            remaining -= cost
+        if sections[i][0] != "header" and len(body) == 1 and len(sections[i][1]) > 1:
+            remaining += len(body[0]) + 1
+            body = []
+        kept[i] = body
+    compacted = "\n\n".join("\n".join(kept[i]) for i in range(len(sections)) if kept[i])
+    return CompactionResult(compacted, estimate_tokens(text), estimate_tokens(compacted), dropped, truncated)
@@ -0,0 +1,308 @@
+"""Persistent SQLite job queue worked by thread pools in one or more processes, with idempotency keys.
+
+Any number of processes may open the same queue file. Claims are atomic and leased: a worker
+keeps its running jobs' leases fresh from a heartbeat thread, and a job whose lease lapses
+(its worker died) is queued again. Ready work is shared fairly between tenants. A succeeded
+job's payload is dropped, and finished jobs are deleted after `JOB_RETENTION_SECONDS`, after
+which their idempotency keys can be used again.
+"""
+from typing import Callable, Dict, List, Optional
+import os
+import json
+import time
+import uuid
+import random
+import socket
+import sqlite3
+import threading
+
+JOB_QUEUE_PATH = os.environ.get("DOBBY_JOBS_PATH", ".dobby_jobs.sqlite3")
+JOB_WORKERS = int(os.environ.get("DOBBY_JOB_WORKERS", 4))
+JOB_MAX_ATTEMPTS = 3
+JOB_RETRY_DELAY = 5.0
+JOB_POLL_INTERVAL = 1.0
+JOB_LEASE_SECONDS = 60.0
+JOB_HEARTBEAT_INTERVAL = 10.0
+JOB_RETENTION_SECONDS = float(os.environ.get("DOBBY_JOB_RETENTION_DAYS", 7)) * 86400
+
+QUEUED, RUNNING, SUCCEEDED, FAILED = "queued", "running", "succeeded", "failed"
+FINISHED_STATUSES = (SUCCEEDED, FAILED)
+
+_COLUMNS = {
+    "tenant": "TEXT NOT NULL DEFAULT ''",
+    "owner": "TEXT",
+    "worker": "TEXT",
+    "lease_until": "REAL",
+}
+
+class JobQueue:
+    """Jobs survive restarts; secrets passed to `enqueue` are held in memory only and never written to disk.
+
+    A job enqueued with in-memory secrets is owned by this queue instance and only runs here while
+    the instance is alive. A job enqueued for a `tenant` carries no secrets; whichever worker claims
+    it asks `secrets_provider(tenant)` for the tenant's credentials. `tenant_weights()` returns the
+    share of running jobs each tenant is entitled to (default 1).
+    """
+
+    def __init__(self, path: str, workers: int = JOB_WORKERS, max_attempts: int = JOB_MAX_ATTEMPTS,
+                 retry_delay: float = JOB_RETRY_DELAY, lease_seconds: float = JOB_LEASE_SECONDS,
+                 secrets_provider: Optional[Callable[[str], Optional[Dict]]] = None,
+                 tenant_weights: Optional[Callable[[], Dict[str, float]]] = None,
+                 retention_seconds: float = JOB_RETENTION_SECONDS):
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.lease_seconds = lease_seconds
+        self.retention_seconds = retention_seconds
+        self.secrets_provider = secrets_provider
+        self.tenant_weights = tenant_weights
+        self.instance_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.workers = workers
+        self.handlers: Dict[str, Callable[[Dict], Optional[Dict]]] = {}
+        self._secrets: Dict[str, Dict] = {}
+        self._running: set = set()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self.conn = sqlite3.connect(path, check_same_thread=False, timeout=30, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        # Processes starting together must not race each other through the migration.
+        self.conn.execute("BEGIN IMMEDIATE")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "id TEXT PRIMARY KEY, idempotency_key TEXT UNIQUE, kind TEXT NOT NULL, payload TEXT NOT NULL, "
+            "status TEXT NOT NULL, result TEXT, error TEXT, attempts INTEGER NOT NULL DEFAULT 0, "
+            "has_secrets INTEGER NOT NULL DEFAULT 0, run_after REAL NOT NULL, "
+            "created_at REAL NOT NULL, updated_at REAL NOT NULL)"
+        )
+        existing = {row[1] for row in self.conn.execute("PRAGMA table_info(jobs)")}
+        for column, definition in _COLUMNS.items():
+            if column not in existing:
+                self.conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {definition}")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS jobs_status_run_after ON jobs (status, run_after)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS jobs_status_tenant ON jobs (status, tenant, run_after)")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS queue_instances (id TEXT PRIMARY KEY, heartbeat_at REAL NOT NULL)")
+        if "kinds" not in {row[1] for row in self.conn.execute("PRAGMA table_info(queue_instances)")}:
+            self.conn.execute("ALTER TABLE queue_instances ADD COLUMN kinds TEXT NOT NULL DEFAULT ''")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS tenant_turns (tenant TEXT PRIMARY KEY, claimed_at REAL NOT NULL)")
+        self.conn.execute("COMMIT")
+        self._heartbeat()
+        self._threads = [threading.Thread(target=self._work, daemon=True, name=f"job-worker-{i}")
+                         for i in range(workers)]
+        self._threads.append(threading.Thread(target=self._keep_alive, daemon=True, name="job-heartbeat"))
+        for thread in self._threads:
+            thread.start()
+
+    def register(self, kind: str, handler: Callable[[Dict], Optional[Dict]]) -> None:
+        self.handlers[kind] = handler
+        self._heartbeat()  # advertise the new kind to other processes straight away
+
+    def live_workers(self, kind: str) -> int:
+        """Queue instances, in any process, that are alive and run jobs of `kind`."""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT kinds FROM queue_instances WHERE heartbeat_at >= ?", (time.time() - self.lease_seconds,)
+            ).fetchall()
+        return sum(kind in row[0].split(",") for row in rows)
+
+    def enqueue(self, kind: str, payload: Dict, idempotency_key: Optional[str] = None,
+                secrets: Optional[Dict] = None, tenant: str = "") -> str:
+        """Queue a job and return its id.
+
+        A repeated `idempotency_key` returns the existing job instead of adding a new one;
+        a previously failed job with that key is queued again.
+        """
+        now = time.time()
+        owner = self.instance_id if secrets else None
+        with self._lock:
+            if idempotency_key is not None:
+                job_id = self._requeue_existing(idempotency_key, secrets, owner, now)
+                if job_id is not None:
+                    return job_id
+            job_id = uuid.uuid4().hex
+            try:
+                self.conn.execute(
+                    "INSERT INTO jobs (id, idempotency_key, kind, payload, status, has_secrets, run_after, "
+                    "created_at, updated_at, tenant, owner) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (job_id, idempotency_key, kind, json.dumps(payload), QUEUED, int(bool(secrets or tenant)),
+                     now, now, now, tenant, owner)
+                )
+            except sqlite3.IntegrityError:
+                # Another process inserted the same idempotency key between our lookup and insert.
+                return self._requeue_existing(idempotency_key, secrets, owner, now)
+            if secrets:
+                self._secrets[job_id] = secrets
+        self._wakeup.set()
+        return job_id
+
+    def _requeue_existing(self, idempotency_key: str, secrets: Optional[Dict], owner: Optional[str],
+                          now: float) -> Optional[str]:
+        row = self.conn.execute(
+            "SELECT id, status FROM jobs WHERE idempotency_key = ?", (idempotency_key,)
+        ).fetchone()
+        if row is None:
+            return None
+        job_id, status = row
+        if status == FAILED:
+            self.conn.execute(
+                "UPDATE jobs SET status = ?, attempts = 0, error = NULL, run_after = ?, updated_at = ?, "
+                "owner = COALESCE(?, owner) WHERE id = ?", (QUEUED, now, now, owner, job_id)
+            )
+            if secrets:
+                self._secrets[job_id] = secrets
+            self._wakeup.set()
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT id, kind, status, result, error, attempts, created_at, updated_at, tenant, worker "
+                "FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            "id": row[0], "kind": row[1], "status": row[2], "result": json.loads(row[3]) if row[3] else None,
+            "error": row[4], "attempts": row[5], "created_at": row[6], "updated_at": row[7],
+            "tenant": row[8], "worker": row[9],
+        }
+
+    def tenant_backlog(self) -> Dict[str, Dict[str, int]]:
+        """Queued and running job counts per tenant, across every worker process."""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT tenant, status, COUNT(*) FROM jobs WHERE status IN (?, ?) GROUP BY tenant, status",
+                (QUEUED, RUNNING)
+            ).fetchall()
+        backlog: Dict[str, Dict[str, int]] = {}
+        for tenant, status, count in rows:
+            backlog.setdefault(tenant, {QUEUED: 0, RUNNING: 0})[status] = count
+        return backlog
+
+    def stop(self) -> None:
+        self._stopping.set()
+        self._wakeup.set()
+        for thread in self._threads:
+            thread.join()
+        with self._lock:
+            self.conn.execute("DELETE FROM queue_instances WHERE id = ?", (self.instance_id,))
+
+    def _heartbeat(self) -> None:
+        now = time.time()
+        with self._lock:
+            # An instance without worker threads only enqueues, so it advertises no kinds.
+            kinds = ",".join(sorted(self.handlers)) if self.workers > 0 else ""
+            self.conn.execute("INSERT OR REPLACE INTO queue_instances (id, heartbeat_at, kinds) VALUES (?, ?, ?)",
+                              (self.instance_id, now, kinds))
+            self.conn.execute("DELETE FROM queue_instances WHERE heartbeat_at < ?", (now - 100 * self.lease_seconds,))
+            self.conn.execute(
+                "DELETE FROM jobs WHERE status IN (?, ?) AND updated_at < ?", (*FINISHED_STATUSES, now - self.retention_seconds)
+            )
+            if self._running:
+                marks = ",".join("?" * len(self._running))
+                self.conn.execute(
+                    f"UPDATE jobs SET lease_until = ? WHERE status = ? AND id IN ({marks})",
+                    (now + self.lease_seconds, RUNNING, *self._running)
+                )
+
+    def _keep_alive(self) -> None:
+        while not self._stopping.wait(min(JOB_HEARTBEAT_INTERVAL, self.lease_seconds / 3)):
+            self._heartbeat()
+
+    def _pick_tenant(self, ready: List[str], now: float) -> str:
+        """The ready tenant with the fewest running jobs per unit of weight; ties go to the longest-waiting."""
+        running = dict(self.conn.execute(
+            "SELECT tenant, COUNT(*) FROM jobs WHERE status = ? AND lease_until >= ? GROUP BY tenant", (RUNNING, now)
+        ).fetchall())
+        turns = dict(self.conn.execute("SELECT tenant, claimed_at FROM tenant_turns").fetchall())
+        weights = self.tenant_weights() if self.tenant_weights else {}
+        return min(ready, key=lambda tenant: (running.get(tenant, 0) / max(weights.get(tenant, 1.0), 1e-6),
+                                              turns.get(tenant, 0.0)))
+
+    def _claim(self):
+        now = time.time()
+        kinds = list(self.handlers)
+        if not kinds:
+            return None
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Jobs whose worker stopped renewing the lease go back on the queue.
+                self.conn.execute(
+                    "UPDATE jobs SET status = ?, worker = NULL WHERE status = ? AND (lease_until IS NULL OR lease_until < ?)",
+                    (QUEUED, RUNNING, now)
+                )
+                # Only kinds this process can handle, and never another live process's in-memory-secret jobs.
+                claimable = (
+                    f"status = ? AND run_after <= ? AND kind IN ({','.join('?' * len(kinds))}) AND "
+                    "(owner IS NULL OR owner = ? OR owner NOT IN (SELECT id FROM queue_instances WHERE heartbeat_at >= ?))"
+                )
+                params = (QUEUED, now, *kinds, self.instance_id, now - self.lease_seconds)
+                ready = [row[0] for row in self.conn.execute(
+                    f"SELECT DISTINCT tenant FROM jobs WHERE {claimable}", params
+                )]
+                if not ready:
+                    self.conn.execute("COMMIT")
+                    return None
+                tenant = self._pick_tenant(ready, now)
+                row = self.conn.execute(
+                    f"SELECT id, kind, payload, attempts, has_secrets, tenant FROM jobs WHERE {claimable} "
+                    "AND tenant = ? ORDER BY run_after LIMIT 1", (*params, tenant)
+                ).fetchone()
+                self.conn.execute(
+                    "UPDATE jobs SET status = ?, attempts = attempts + 1, worker = ?, lease_until = ?, updated_at = ? "
+                    "WHERE id = ?", (RUNNING, self.instance_id, now + self.lease_seconds, now, row[0])
+                )
+                self.conn.execute("INSERT OR REPLACE INTO tenant_turns VALUES (?, ?)", (tenant, now))
+                self.conn.execute("COMMIT")
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+            self._running.add(row[0])
+            return row[0], row[1], json.loads(row[2]), row[3] + 1, bool(row[4]), row[5]
+
+    def _finish(self, job_id: str, status: str, result=None, error=None, run_after=None) -> None:
+        now = time.time()
+        with self._lock:
+            # A succeeded job is never run again, so its payload (a whole resume, for screening) can go.
+            self.conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, run_after = COALESCE(?, run_after), "
+                "updated_at = ?, payload = CASE WHEN ? = ? THEN '{}' ELSE payload END WHERE id = ? AND worker = ?",
+                (status, json.dumps(result) if result is not None else None, error, run_after, now,
+                 status, SUCCEEDED, job_id, self.instance_id)
+            )
+            self._running.discard(job_id)
+            if status in FINISHED_STATUSES:
+                self._secrets.pop(job_id, None)
+
+    def _run(self, job_id: str, kind: str, payload: Dict, attempts: int, has_secrets: bool, tenant: str) -> None:
+        handler = self.handlers.get(kind)
+        if handler is None:
+            self._finish(job_id, FAILED, error=f"No handler registered for job kind '{kind}'")
+            return
+        if has_secrets:
+            secrets = self._secrets.get(job_id)
+            if secrets is None and tenant and self.secrets_provider is not None:
+                secrets = self.secrets_provider(tenant)
+            if secrets is None:
+                self._finish(job_id, FAILED, error="Credentials are no longer available; submit the job again.")
+                return
+            payload = {**payload, **secrets}
+        try:
+            result = handler(payload)
+        except Exception as e:
+            if attempts < self.max_attempts:
+                delay = random.uniform(0.5, 1.0) * self.retry_delay * 2 ** (attempts - 1)
+                self._finish(job_id, QUEUED, error=str(e), run_after=time.time() + delay)
+            else:
+                self._finish(job_id, FAILED, error=str(e))
+            return
+        self._finish(job_id, SUCCEEDED, result=result)
+
+    def _work(self) -> None:
+        while not self._stopping.is_set():
+            job = self._claim()
+            if job is None:
+                self._wakeup.wait(JOB_POLL_INTERVAL)
+                self._wakeup.clear()
+                continue
+            self._run(*job)
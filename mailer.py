@@ -0,0 +1,206 @@
+"""Pooled, authenticated SMTP sessions and a rate-limited bulk dispatcher."""
+from typing import Dict, List, Optional, Tuple
+import os
+import time
+import queue
+import random
+import hashlib
+import smtplib
+import threading
+from contextlib import contextmanager
+from email.mime.text import MIMEText
+from email.mime.multipart import MIMEMultipart
+
+import telemetry
+
+SMTP_HOST = os.environ.get("DOBBY_SMTP_HOST", "smtp.gmail.com")
+SMTP_PORT = int(os.environ.get("DOBBY_SMTP_PORT", 465))
+SMTP_USE_SSL = os.environ.get("DOBBY_SMTP_SSL", "1") != "0"
+SMTP_TIMEOUT = 30
+SMTP_POOL_SIZE = 2
+SMTP_IDLE_TIMEOUT = 120  # seconds before an idle session is re-checked with NOOP
+SMTP_MAX_MESSAGES_PER_CONNECTION = 90
+SMTP_MAX_RETRIES = 3
+SMTP_MESSAGES_PER_SECOND = float(os.environ.get("DOBBY_SMTP_RATE", 2.0))  # per account; 0 = unpaced
+
+TRANSIENT_ERRORS = (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError, ConnectionError, TimeoutError)
+
+def build_message(sender_email: str, to_email: str, subject: str, body: str) -> MIMEMultipart:
+    msg = MIMEMultipart()
+    msg['From'] = sender_email
+    msg['To'] = to_email
+    msg['Subject'] = subject
+    msg.attach(MIMEText(body, 'plain'))
+    return msg
+
+def is_transient(error: Exception) -> bool:
+    if isinstance(error, smtplib.SMTPResponseException):
+        return 400 <= error.smtp_code < 500
+    return isinstance(error, TRANSIENT_ERRORS)
+
+def session_survives(error: Exception) -> bool:
+    """Permanent per-message rejections leave the SMTP session usable; anything else may not."""
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return True
+    return isinstance(error, smtplib.SMTPResponseException) and error.smtp_code >= 500
+
+class _Pacer:
+    """Spaces calls at least `1 / per_second` apart across all threads."""
+
+    def __init__(self, per_second: float):
+        self.interval = 1.0 / per_second if per_second > 0 else 0.0
+        self.next_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def wait(self) -> None:
+        with self.lock:
+            now = time.monotonic()
+            delay = self.next_at - now
+            self.next_at = max(now, self.next_at) + self.interval
+        if delay > 0:
+            time.sleep(delay)
+
+class _PooledConnection:
+    def __init__(self, smtp):
+        self.smtp = smtp
+        self.sent = 0
+        self.last_used = time.monotonic()
+
+    def close(self) -> None:
+        try:
+            self.smtp.quit()
+        except Exception:
+            self.smtp.close()
+
+class SMTPPool:
+    """A bounded set of logged-in SMTP sessions that are reused across messages and threads.
+
+    Every message sent through the pool, single or bulk, is paced at `per_second`, so one
+    account stays under its provider's rate limit however many callers share it.
+    """
+
+    def __init__(self, username: str, password: str, host: str = SMTP_HOST, port: int = SMTP_PORT,
+                 size: int = SMTP_POOL_SIZE, use_ssl: bool = SMTP_USE_SSL, timeout: float = SMTP_TIMEOUT,
+                 max_messages: int = SMTP_MAX_MESSAGES_PER_CONNECTION, idle_timeout: float = SMTP_IDLE_TIMEOUT,
+                 per_second: float = SMTP_MESSAGES_PER_SECOND):
+        self.username = username
+        self.password = password
+        self.host = host
+        self.port = port
+        self.size = size
+        self.use_ssl = use_ssl
+        self.timeout = timeout
+        self.max_messages = max_messages
+        self.idle_timeout = idle_timeout
+        self._idle: List[_PooledConnection] = []
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(size)
+        self._pacer = _Pacer(per_second)
+
+    def _connect(self) -> _PooledConnection:
+        smtp_class = smtplib.SMTP_SSL if self.use_ssl else smtplib.SMTP
+        smtp = smtp_class(self.host, self.port, timeout=self.timeout)
+        if self.username:
+            smtp.login(self.username, self.password)
+        return _PooledConnection(smtp)
+
+    def _checkout(self) -> _PooledConnection:
+        with self._lock:
+            conn = self._idle.pop() if self._idle else None
+        if conn is not None and time.monotonic() - conn.last_used > self.idle_timeout:
+            try:
+                if conn.smtp.noop()[0] != 250:
+                    raise smtplib.SMTPServerDisconnected("stale session")
+            except Exception:
+                conn.close()
+                conn = None
+        return conn or self._connect()
+
+    @contextmanager
+    def connection(self):
+        """Borrow a session; it goes back to the pool unless it broke or hit `max_messages`."""
+        self._slots.acquire()
+        conn = None
+        try:
+            conn = self._checkout()
+            yield conn
+        except Exception as e:
+            if conn is not None and not session_survives(e):
+                conn.smtp.close()
+                conn = None
+            raise
+        finally:
+            if conn is not None:
+                conn.last_used = time.monotonic()
+                if conn.sent >= self.max_messages:
+                    conn.close()
+                else:
+                    with self._lock:
+                        self._idle.append(conn)
+            self._slots.release()
+
+    def send(self, msg, retries: int = SMTP_MAX_RETRIES) -> int:
+        """Send one message, retrying transient failures on a fresh session. Returns the attempt count."""
+        for attempt in range(1, retries + 2):
+            self._pacer.wait()
+            try:
+                with telemetry.span("smtp_send", attempt=attempt), self.connection() as conn:
+                    conn.smtp.send_message(msg)
+                    conn.sent += 1
+                return attempt
+            except Exception as e:
+                if attempt > retries or not is_transient(e):
+                    raise
+                time.sleep(random.uniform(0, min(10.0, 0.5 * 2 ** attempt)))
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+_pools: Dict[Tuple[str, int, str, str], SMTPPool] = {}
+_pools_lock = threading.Lock()
+
+def get_pool(username: str, password: str, host: str = SMTP_HOST, port: int = SMTP_PORT, **kwargs) -> SMTPPool:
+    """Process-wide pool per (server, account, password) so a changed app password gets a new pool."""
+    key = (host, port, username, hashlib.sha256(password.encode("utf-8")).hexdigest())
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = SMTPPool(username, password, host, port, **kwargs)
+        return pool
+
+def send_bulk(pool: SMTPPool, messages: List, retries: int = SMTP_MAX_RETRIES,
+              workers: Optional[int] = None) -> List[Dict]:
+    """Dispatch many messages over the pool's sessions, at the pool's rate.
+
+    Returns one outcome dict per message, in input order, with `to`, `subject`,
+    `sent`, `attempts` and `error` keys.
+    """
+    outcomes: List[Optional[Dict]] = [None] * len(messages)
+    pending: "queue.Queue[int]" = queue.Queue()
+    for index in range(len(messages)):
+        pending.put(index)
+    def worker():
+        while True:
+            try:
+                index = pending.get_nowait()
+            except queue.Empty:
+                return
+            msg = messages[index]
+            outcome = {"to": msg['To'], "subject": msg['Subject'], "sent": False, "attempts": 0, "error": None}
+            try:
+                outcome["attempts"] = pool.send(msg, retries=retries)
+                outcome["sent"] = True
+            except Exception as e:
+                outcome["attempts"] = retries + 1 if is_transient(e) else 1
+                outcome["error"] = str(e)
+            outcomes[index] = outcome
+
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(min(workers or pool.size, len(messages)))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return outcomes
@@ -0,0 +1,243 @@
+"""Local stand-ins for the Fireworks chat API, the Zoom OAuth/meetings API and an SMTP server.
+
+Used by benchmark.py; each server binds to 127.0.0.1 on a free port and runs on daemon threads.
+"""
+from typing import Dict, List, Optional
+import json
+import time
+import random
+import base64
+import threading
+import socketserver
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+VERDICT = {
+    "selected": True,
+    "feedback": "Solid backend experience with Python services, SQL databases and container-based deployment.",
+    "matching_skills": ["Python", "PostgreSQL", "Docker", "REST APIs"],
+    "missing_skills": ["Kubernetes"],
+    "experience_level": "mid",
+}
+
+class _JsonHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _body(self) -> bytes:
+        return self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+    def _reply(self, status: int, payload, headers: Optional[Dict[str, str]] = None) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+class _Server:
+    """Runs a socketserver on a daemon thread; `url`/`port` are valid once constructed."""
+
+    def __init__(self, server: socketserver.BaseServer):
+        self.server = server
+        self.server.daemon_threads = True
+        self.host, self.port = server.server_address[:2]
+        self.thread = threading.Thread(target=server.serve_forever, daemon=True, name=type(self).__name__)
+        self.thread.start()
+
+    def close(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+class MockChatServer(_Server):
+    """OpenAI-style /chat/completions with configurable latency, 429 rate and fenced (non-bare) JSON.
+
+    Latency is `latency` seconds plus `per_token` seconds for each completion token; streamed
+    responses spread that time across SSE chunks. Usage is reported like Fireworks does. Requests
+    for a routing-tier verdict get a `confidence`, fixed or drawn uniformly from 0.5-1.0.
+    """
+
+    def __init__(self, latency: float = 0.2, per_token: float = 0.0, error_rate: float = 0.0,
+                 retry_after: float = 0.0, fenced_rate: float = 0.0, seed: int = 0, verdict: Dict = VERDICT,
+                 confidence: Optional[float] = None):
+        self.latency = latency
+        self.per_token = per_token
+        self.error_rate = error_rate
+        self.retry_after = retry_after
+        self.fenced_rate = fenced_rate
+        self.verdict = verdict
+        self.confidence = confidence
+        self.requests = 0
+        self.rate_limited = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        super().__init__(ThreadingHTTPServer(("127.0.0.1", 0), self._handler()))
+        self.url = f"http://{self.host}:{self.port}/inference/v1/chat/completions"
+
+    def _roll(self, rate: float) -> bool:
+        with self._lock:
+            return self._random.random() < rate
+
+    def _content(self, payload: Dict) -> str:
+        system_prompt = payload["messages"][0]["content"] if payload.get("messages") else ""
+        if "<role name>" in system_prompt:
+            roles = [line[4:].strip() for line in system_prompt.splitlines() if line.startswith("### ")]
+            content = json.dumps({"roles": {role: self.verdict for role in roles}})
+        elif '"confidence"' in payload["messages"][-1]["content"]:
+            with self._lock:
+                confidence = self._random.uniform(0.5, 1.0) if self.confidence is None else self.confidence
+            content = json.dumps({**self.verdict, "confidence": round(confidence, 2)})
+        else:
+            content = json.dumps(self.verdict)
+        if self._roll(self.fenced_rate):
+            content = f"Here is my assessment:\n```json\n{content}\n```"
+        return content
+
+    def _handler(self):
+        mock = self
+
+        class Handler(_JsonHandler):
+            def do_POST(self):
+                payload = json.loads(self._body() or b"{}")
+                with mock._lock:
+                    mock.requests += 1
+                if mock._roll(mock.error_rate):
+                    with mock._lock:
+                        mock.rate_limited += 1
+                    self._reply(429, {"error": "rate limited"}, {"Retry-After": str(mock.retry_after)})
+                    return
+                content = mock._content(payload)
+                prompt_tokens = len(json.dumps(payload.get("messages", []))) // 4
+                completion_tokens = max(1, len(content) // 4)
+                usage = {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                         "total_tokens": prompt_tokens + completion_tokens}
+                duration = mock.latency + mock.per_token * completion_tokens
+                if payload.get("stream"):
+                    self._stream(content, usage, duration)
+                    return
+                time.sleep(duration)
+                self._reply(200, {"choices": [{"index": 0, "message": {"role": "assistant", "content": content},
+                                               "finish_reason": "stop"}], "usage": usage})
+
+            def _stream(self, content: str, usage: Dict, duration: float) -> None:
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                chunks = [content[i:i + 16] for i in range(0, len(content), 16)]
+                time.sleep(duration / 2)
+                for chunk in chunks:
+                    time.sleep(duration / 2 / len(chunks))
+                    event = {"choices": [{"index": 0, "delta": {"content": chunk}}]}
+                    self.wfile.write(f"data: {json.dumps(event)}\n\n".encode("utf-8"))
+                self.wfile.write(f"data: {json.dumps({'choices': [], 'usage': usage})}\n\n".encode("utf-8"))
+                self.wfile.write(b"data: [DONE]\n\n")
+                self.close_connection = True
+
+        return Handler
+
+class MockZoomServer(_Server):
+    """Account-credentials /oauth/token plus /v2/users/me/meetings."""
+
+    def __init__(self, latency: float = 0.05, expires_in: int = 3600):
+        self.latency = latency
+        self.expires_in = expires_in
+        self.token_requests = 0
+        self.meetings: List[Dict] = []
+        self._lock = threading.Lock()
+        super().__init__(ThreadingHTTPServer(("127.0.0.1", 0), self._handler()))
+        self.token_url = f"http://{self.host}:{self.port}/oauth/token"
+        self.api_url = f"http://{self.host}:{self.port}/v2"
+
+    def _handler(self):
+        mock = self
+
+        class Handler(_JsonHandler):
+            def do_POST(self):
+                body = self._body()
+                time.sleep(mock.latency)
+                if self.path.startswith("/oauth/token"):
+                    with mock._lock:
+                        mock.token_requests += 1
+                        token = f"token-{mock.token_requests}"
+                    self._reply(200, {"access_token": token, "token_type": "bearer", "expires_in": mock.expires_in})
+                elif self.path.startswith("/v2/users/me/meetings"):
+                    if not self.headers.get("Authorization", "").startswith("Bearer token-"):
+                        self._reply(401, {"message": "Invalid access token."})
+                        return
+                    meeting = json.loads(body or b"{}")
+                    with mock._lock:
+                        mock.meetings.append(meeting)
+                        meeting_id = 80000000000 + len(mock.meetings)
+                    self._reply(201, {"id": meeting_id, "join_url": f"https://zoom.example/j/{meeting_id}", **meeting})
+                else:
+                    self._reply(404, {"message": "Not found"})
+
+        return Handler
+
+class SMTPSink(_Server):
+    """Plain-text SMTP server that accepts AUTH PLAIN/LOGIN and keeps every message in memory."""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.messages: List[Dict] = []
+        self.connections = 0
+        self._lock = threading.Lock()
+        super().__init__(socketserver.ThreadingTCPServer(("127.0.0.1", 0), self._handler()))
+
+    def _handler(self):
+        sink = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def reply(self, line: str) -> None:
+                self.wfile.write(line.encode("ascii") + b"\r\n")
+
+            def handle(self):
+                with sink._lock:
+                    sink.connections += 1
+                self.reply("220 localhost mock SMTP")
+                sender, recipients = None, []
+                while True:
+                    raw = self.rfile.readline()
+                    if not raw:
+                        return
+                    line = raw.decode("utf-8", "replace").rstrip("\r\n")
+                    command = line[:4].upper()
+                    if command in ("EHLO", "HELO"):
+                        self.wfile.write(b"250-localhost\r\n250-AUTH PLAIN LOGIN\r\n250 8BITMIME\r\n")
+                    elif command == "AUTH":
+                        if line.upper().startswith("AUTH LOGIN"):
+                            self.reply("334 " + base64.b64encode(b"Username:").decode())
+                            self.rfile.readline()
+                            self.reply("334 " + base64.b64encode(b"Password:").decode())
+                            self.rfile.readline()
+                        self.reply("235 Authentication successful")
+                    elif command == "MAIL":
+                        sender, recipients = line[10:].strip("<> "), []
+                        self.reply("250 OK")
+                    elif command == "RCPT":
+                        recipients.append(line[8:].strip("<> "))
+                        self.reply("250 OK")
+                    elif command == "DATA":
+                        self.reply("354 End data with <CR><LF>.<CR><LF>")
+                        data = []
+                        for raw in iter(self.rfile.readline, b""):
+                            if raw in (b".\r\n", b".\n"):
+                                break
+                            data.append(raw)
+                        time.sleep(sink.latency)
+                        with sink._lock:
+                            sink.messages.append({"from": sender, "to": recipients, "size": sum(map(len, data))})
+                        self.reply("250 OK queued")
+                    elif command in ("RSET", "NOOP"):
+                        self.reply("250 OK")
+                    elif command == "QUIT":
+                        self.reply("221 Bye")
+                        return
+                    else:
+                        self.reply("502 Command not implemented")
+
+        return Handler
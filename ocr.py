@@ -0,0 +1,185 @@
+"""Optional Tesseract OCR for PDF pages that have no text layer (scanned resumes).
+
+Pages are rendered with poppler's `pdftoppm` at `OCR_DPI` when it is installed, otherwise the
+page's largest embedded image (the scan itself) is used. Each page runs in its own `tesseract`
+subprocess, at lower priority with one thread and a CPU-seconds limit. At most `OCR_WORKERS`
+run at once in a process, so scanned CVs cannot starve interactive screening. Results are
+cached by a hash of the page's content stream and raw image streams.
+"""
+from typing import Dict, List, Optional
+import os
+import time
+import shutil
+import hashlib
+import logging
+import tempfile
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+import telemetry
+from pdf_extraction import TextCache
+
+OCR_MODE = os.environ.get("DOBBY_OCR", "auto")  # "auto" (on when tesseract is installed), "1" (required) or "0"
+TESSERACT_CMD = os.environ.get("DOBBY_TESSERACT", "tesseract")
+PDFTOPPM_CMD = os.environ.get("DOBBY_PDFTOPPM", "pdftoppm")
+OCR_LANGUAGE = os.environ.get("DOBBY_OCR_LANG", "eng")
+OCR_DPI = int(os.environ.get("DOBBY_OCR_DPI", 200))
+OCR_WORKERS = int(os.environ.get("DOBBY_OCR_WORKERS", max(1, (os.cpu_count() or 1) // 4)))
+OCR_PAGE_CPU_SECONDS = 30
+OCR_PAGE_TIMEOUT = 60.0  # wall seconds for one page, rendering included
+OCR_JOB_SECONDS = 180.0  # wall seconds for all the pages of one PDF
+OCR_NICE = 10
+OCR_CACHE_ENTRIES = 1024
+
+logger = logging.getLogger("dobby")
+
+def available() -> bool:
+    """Whether OCR runs: not with DOBBY_OCR=0, otherwise whenever tesseract is installed."""
+    return OCR_MODE != "0" and shutil.which(TESSERACT_CMD) is not None
+
+def check_required() -> None:
+    """Raise at startup when DOBBY_OCR=1 but tesseract is missing, rather than silently skipping scans."""
+    if OCR_MODE == "1" and shutil.which(TESSERACT_CMD) is None:
+        raise RuntimeError(f"DOBBY_OCR=1 but '{TESSERACT_CMD}' was not found on PATH")
+
+def _limited(command: List[str]) -> List[str]:
+    """Lower priority and cap CPU seconds through the shell, so no Python runs between fork and exec."""
+    if os.name != "posix":
+        return command
+    return ["sh", "-c", f'ulimit -t {OCR_PAGE_CPU_SECONDS} && exec nice -n {OCR_NICE} "$@"', "sh", *command]
+
+def _run(command: List[str], input: Optional[bytes], timeout: float) -> bytes:
+    result = subprocess.run(
+        _limited(command), input=input, capture_output=True, timeout=timeout,
+        env={**os.environ, "OMP_THREAD_LIMIT": "1"},
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"{os.path.basename(command[0])} exited with {result.returncode}: "
+                           f"{result.stderr.decode('utf-8', 'replace').strip()[:200]}")
+    return result.stdout
+
+def _page_images(page) -> List[bytes]:
+    try:
+        return [image.data for image in page.images]
+    except Exception:  # an image filter PyPDF2 cannot decode
+        return []
+
+def _xobject_streams(resources, seen: set) -> List[bytes]:
+    """Raw, undecoded bytes of every XObject the resources reference, following nested forms."""
+    streams = []
+    xobjects = (resources or {}).get("/XObject")
+    if xobjects is None:
+        return streams
+    xobjects = xobjects.get_object()
+    for name in sorted(xobjects):
+        stream = xobjects[name].get_object()
+        if id(stream) in seen:
+            continue
+        seen.add(id(stream))
+        streams.append(stream._data)
+        if stream.get("/Subtype") == "/Form":
+            streams.extend(_xobject_streams(stream.get("/Resources"), seen))
+    return streams
+
+def page_fingerprint(page, data: bytes, index: int) -> str:
+    """SHA-256 of a page's content stream and raw image streams: identical scans hash alike in any PDF.
+
+    Falls back to the whole PDF's digest and the page index when the page's objects cannot be read.
+    """
+    digest = hashlib.sha256()
+    try:
+        contents = page.get_contents()
+        if contents is not None:
+            digest.update(contents.get_data())
+        for stream in _xobject_streams(page.get("/Resources"), set()):
+            digest.update(hashlib.sha256(stream).digest())
+    except Exception:
+        return f"{hashlib.sha256(data).hexdigest()}:{index}"
+    return digest.hexdigest()
+
+class OcrEngine:
+    """A bounded pool of tesseract subprocesses shared by every extraction in the process."""
+
+    def __init__(self, workers: int = OCR_WORKERS, dpi: int = OCR_DPI, language: str = OCR_LANGUAGE,
+                 page_timeout: float = OCR_PAGE_TIMEOUT, job_seconds: float = OCR_JOB_SECONDS,
+                 cache: Optional[TextCache] = None):
+        self.dpi = dpi
+        self.language = language
+        self.page_timeout = page_timeout
+        self.job_seconds = job_seconds
+        self.cache = cache if cache is not None else TextCache(OCR_CACHE_ENTRIES)
+        self.renderer = shutil.which(PDFTOPPM_CMD)
+        self._pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="ocr")
+
+    def _cache_key(self, fingerprint: str) -> str:
+        return f"{fingerprint}:{self.dpi}:{self.language}"
+
+    def _ocr_page(self, pdf_path: str, index: int, scan: Optional[bytes], deadline: float) -> str:
+        """Render page `index` (or take its embedded `scan`) and OCR it within the PDF's `deadline`."""
+        started = time.monotonic()
+        if started >= deadline:
+            raise TimeoutError("OCR time budget for this PDF is used up")
+        image = scan
+        if self.renderer:
+            image = _run([self.renderer, "-r", str(self.dpi), "-f", str(index + 1), "-l", str(index + 1),
+                          "-png", "-singlefile", pdf_path], None, min(self.page_timeout, deadline - started))
+        if not image:
+            return ""
+        timeout = min(started + self.page_timeout, deadline) - time.monotonic()
+        if timeout <= 0:
+            raise TimeoutError("OCR time budget for this PDF is used up")
+        output = _run([TESSERACT_CMD, "stdin", "stdout", "--dpi", str(self.dpi), "-l", self.language],
+                      image, timeout)
+        return output.decode("utf-8", "replace")
+
+    def ocr_pages(self, data: bytes, pages: Dict[int, object]) -> Dict[int, str]:
+        """OCR text by page index for the given PyPDF2 pages of `data`; pages that fail or time out are left out."""
+        results: Dict[int, str] = {}
+        todo = {}
+        for index, page in pages.items():
+            # PyPDF2 is read here, on the calling thread; the pool threads only run subprocesses.
+            images = _page_images(page)
+            key = self._cache_key(page_fingerprint(page, data, index))
+            cached = self.cache.get(key)
+            if cached is not None:
+                results[index] = cached
+            elif images or self.renderer:
+                todo[index] = (max(images, key=len) if images else None, key)
+        with telemetry.span("ocr", pages=len(pages), cached=len(results), dpi=self.dpi) as details:
+            if not todo:
+                return results
+            deadline = time.monotonic() + self.job_seconds
+            pdf_path = ""
+            if self.renderer:
+                with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as f:
+                    f.write(data)
+                    pdf_path = f.name
+            try:
+                futures = {index: self._pool.submit(self._ocr_page, pdf_path, index, scan, deadline)
+                           for index, (scan, _) in todo.items()}
+                failed = 0
+                for index, future in futures.items():
+                    try:
+                        text = future.result()
+                    except (subprocess.TimeoutExpired, TimeoutError, RuntimeError, OSError) as e:
+                        failed += 1
+                        logger.warning(f"OCR skipped page {index + 1}: {e}")
+                        continue
+                    self.cache.put(todo[index][1], text)
+                    results[index] = text
+                details["failed"] = failed
+            finally:
+                if pdf_path:
+                    os.unlink(pdf_path)
+        return results
+
+_engine: Optional[OcrEngine] = None
+_engine_lock = threading.Lock()
+
+def get_engine() -> OcrEngine:
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = OcrEngine()
+        return _engine
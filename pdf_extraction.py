@@ -0,0 +1,133 @@
+"""PDF text extraction engines with a content-addressed text cache."""
+from typing import List, Optional
+import io
+import os
+import hashlib
+import threading
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+import PyPDF2
+
+PDF_MAX_PAGES = 30
+PDF_MAX_BYTES = 20 * 1024 * 1024
+PDF_PARALLEL_MIN_PAGES = 8
+PDF_TEXT_CACHE_ENTRIES = 256
+
+def _extract_page_range(data: bytes, start: int, stop: int) -> List[str]:
+    reader = PyPDF2.PdfReader(io.BytesIO(data))
+    return [reader.pages[i].extract_text() or "" for i in range(start, stop)]
+
+class SerialExtractor:
+    """Extracts pages one after another in the calling thread."""
+
+    def extract_pages(self, data: bytes, page_count: int) -> List[str]:
+        return _extract_page_range(data, 0, page_count)
+
+class ProcessPoolExtractor:
+    """Spreads page ranges of long PDFs across worker processes; short PDFs stay in-process."""
+
+    def __init__(self, max_workers: Optional[int] = None, min_pages: int = PDF_PARALLEL_MIN_PAGES):
+        self.max_workers = max_workers or min(4, os.cpu_count() or 1)
+        self.min_pages = min_pages
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._pool
+
+    def extract_pages(self, data: bytes, page_count: int) -> List[str]:
+        if page_count < self.min_pages or self.max_workers < 2:
+            return _extract_page_range(data, 0, page_count)
+        step = -(-page_count // self.max_workers)
+        starts = range(0, page_count, step)
+        futures = [self._get_pool().submit(_extract_page_range, data, start, min(start + step, page_count))
+                   for start in starts]
+        pages = []
+        for future in futures:
+            pages.extend(future.result())
+        return pages
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(cancel_futures=True)
+                self._pool = None
+
+class TextCache:
+    """Thread-safe in-memory LRU of extracted text keyed by the SHA-256 of the PDF bytes."""
+
+    def __init__(self, max_entries: int = PDF_TEXT_CACHE_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            text = self._entries.get(key)
+            if text is not None:
+                self._entries.move_to_end(key)
+            return text
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def put(self, key: str, text: str) -> None:
+        with self._lock:
+            self._entries[key] = text
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+default_extractor = ProcessPoolExtractor()
+text_cache = TextCache()
+
+def pdf_digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+def page_count(data: bytes) -> int:
+    return len(PyPDF2.PdfReader(io.BytesIO(data)).pages)
+
+def _ocr_blank_pages(data: bytes, pages: List[str]) -> List[str]:
+    """Fill pages without a text layer from OCR, when Tesseract is installed."""
+    blank = [i for i, text in enumerate(pages) if not text.strip()]
+    if not blank:
+        return pages
+    import ocr
+
+    if not ocr.available():
+        return pages
+    reader = PyPDF2.PdfReader(io.BytesIO(data))
+    recognised = ocr.get_engine().ocr_pages(data, {i: reader.pages[i] for i in blank})
+    return [recognised.get(i, text) for i, text in enumerate(pages)]
+
+def extract_text(data: bytes, extractor=None, max_pages: int = PDF_MAX_PAGES,
+                 max_bytes: int = PDF_MAX_BYTES, cache: Optional[TextCache] = text_cache,
+                 ocr_fallback: bool = True) -> str:
+    """Extract the text of at most `max_pages` pages, reusing earlier results for identical bytes.
+
+    Pages with no text layer go through OCR when it is available (see ocr.py).
+    """
+    if len(data) > max_bytes:
+        raise ValueError(f"PDF is {len(data) // 1024} KB, above the {max_bytes // 1024} KB limit")
+    key = f"{pdf_digest(data)}:{max_pages}"
+    if cache is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+    pages_to_read = min(page_count(data), max_pages)
+    pages = (extractor or default_extractor).extract_pages(data, pages_to_read)
+    if ocr_fallback:
+        pages = _ocr_blank_pages(data, pages)
+    text = "\f".join(pages)  # a form feed between pages lets compaction find running headers and footers
+    if cache is not None:
+        cache.put(key, text)
+    return text
+
@@ -0,0 +1,990 @@
+"""Headless screening pipeline: PDF extraction, Dobby analysis, email, Zoom and the background job handlers.
+
+Nothing here imports Streamlit. Failures that the original UI showed with `st.error` are logged
+on the "dobby" logger instead; the app forwards that logger to `st.error`.
+"""
+from typing import Tuple, Dict, List, Iterator, Callable, Optional
+import os
+import io
+import re
+import json
+import time
+import base64
+import hashlib
+import logging
+import sqlite3
+import random
+import threading
+import zipfile
+import functools
+from email.utils import parsedate_to_datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+import pytz
+
+import candidate_store
+import compaction
+import jobs
+import prefilter
+import scheduling
+import structured_output
+import telemetry
+import tenants
+import zoom_tokens
+
+logger = logging.getLogger("dobby")
+
+DEFAULT_BATCH_CONCURRENCY = 4
+MAX_BATCH_CONCURRENCY = 16
+SCREENING_IDLE_TIMEOUT = float(os.environ.get("DOBBY_SCREENING_TIMEOUT", 300))  # seconds without worker progress
+
+DOBBY_MODEL = "accounts/sentientfoundation/models/dobby-unhinged-llama-3-3-70b-new"
+FIREWORKS_CHAT_URL = os.environ.get("DOBBY_CHAT_URL", "https://api.fireworks.ai/inference/v1/chat/completions")
+DOBBY_REQUEST_TIMEOUT = (10, 120)  # (connect, read) seconds
+DOBBY_MAX_RETRIES = 4
+DOBBY_BACKOFF_BASE = 1.0
+DOBBY_BACKOFF_CAP = 30.0
+DOBBY_REQUESTS_PER_MINUTE = float(os.environ.get("DOBBY_REQUESTS_PER_MINUTE", 60))
+DOBBY_BURST = 8
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# Routing tier: a small model screens first and only low-confidence verdicts go to the 70B model.
+ROUTER_MODEL = os.environ.get("DOBBY_ROUTER_MODEL", "")  # empty: every verdict comes from DOBBY_MODEL
+ROUTER_MIN_CONFIDENCE = float(os.environ.get("DOBBY_ROUTER_MIN_CONFIDENCE", 0.85))
+ROUTER_MAX_TOKENS = 512
+
+ZOOM_API_URL = os.environ.get("ZOOM_API_URL", "https://api.zoom.us/v2")
+
+ANALYSIS_CACHE_PATH = os.environ.get("DOBBY_CACHE_PATH", ".dobby_cache.sqlite3")
+ANALYSIS_CACHE_TTL = 30 * 24 * 3600  # seconds
+ANALYSIS_CACHE_MAX_ENTRIES = 10000
+
+def shared_resource(factory):
+    """Build one instance per distinct arguments and share it process-wide (the headless `st.cache_resource`)."""
+    instances = {}
+    lock = threading.Lock()
+
+    @functools.wraps(factory)
+    def get(*args):
+        with lock:
+            if args not in instances:
+                instances[args] = factory(*args)
+            return instances[args]
+    return get
+
+class TokenBucket:
+    """Thread-safe token bucket; `acquire` blocks until a request may be sent."""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+@shared_resource
+def get_http_session() -> "requests.Session":
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=MAX_BATCH_CONCURRENCY)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+@shared_resource
+def get_rate_limiter(api_key: str) -> TokenBucket:
+    return TokenBucket(DOBBY_REQUESTS_PER_MINUTE / 60.0, DOBBY_BURST)
+
+def retry_delay(response, attempt: int) -> Optional[float]:
+    """Full-jitter exponential backoff, never shorter than the server's Retry-After.
+
+    None when the server asks for a wait longer than `DOBBY_BACKOFF_CAP`: the caller gives up
+    rather than block a screening thread that long.
+    """
+    delay = random.uniform(0, min(DOBBY_BACKOFF_CAP, DOBBY_BACKOFF_BASE * 2 ** attempt))
+    retry_after = response.headers.get("Retry-After") if response is not None else None
+    if retry_after:
+        try:
+            requested = float(retry_after)
+        except ValueError:
+            try:
+                requested = parsedate_to_datetime(retry_after).timestamp() - time.time()
+            except (TypeError, ValueError):
+                requested = 0.0
+        if requested > DOBBY_BACKOFF_CAP:
+            return None
+        delay = max(delay, requested)
+    return delay
+
+class DobbyChat:
+    def __init__(self, api_key, model=DOBBY_MODEL,
+                 session=None, rate_limiter=None, timeout=DOBBY_REQUEST_TIMEOUT, max_retries=DOBBY_MAX_RETRIES):
+        self.api_key = api_key
+        self.model = model
+        self.session = session or get_http_session()
+        self.rate_limiter = rate_limiter or get_rate_limiter(api_key)
+        self.timeout = timeout
+        self.max_retries = max_retries
+
+    def _payload(self, messages, **kwargs):
+        payload = {
+            "model": self.model,
+            "messages": messages,
+            "max_tokens": kwargs.get("max_tokens", 2048),
+            "top_p": kwargs.get("top_p", 1),
+            "top_k": kwargs.get("top_k", 40),
+            "presence_penalty": kwargs.get("presence_penalty", 0),
+            "frequency_penalty": kwargs.get("frequency_penalty", 0),
+            "temperature": kwargs.get("temperature", 0.6)
+        }
+        if "response_format" in kwargs:
+            payload["response_format"] = kwargs["response_format"]
+        return payload
+
+    def _headers(self, accept="application/json"):
+        return {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json",
+            "Accept": accept
+        }
+
+    def chat(self, messages, **kwargs):
+        with telemetry.span("llm_call", model=self.model, mode="chat") as details:
+            response = self._post(self._headers(), self._payload(messages, **kwargs))
+            data = response.json()
+            self.last_usage = data.get("usage")
+            telemetry.record_usage(self.last_usage, self.model)
+            details.update(self.last_usage or {})
+            return data["choices"][0]["message"]["content"]
+
+    def chat_stream(self, messages, **kwargs) -> Iterator[str]:
+        """Yield completion text deltas as the server sends them (server-sent events).
+
+        Usage arrives in the last event; when the caller stops reading before it, token
+        counts are estimated from the text instead.
+        """
+        payload = self._payload(messages, **kwargs)
+        payload["stream"] = True
+        with telemetry.span("llm_call", model=self.model, mode="stream") as details:
+            started = time.perf_counter()
+            response = self._post(self._headers("text/event-stream"), payload, stream=True)
+            response.encoding = "utf-8"
+            self.last_usage = None
+            received = []
+            try:
+                for line in response.iter_lines(decode_unicode=True):
+                    if not line or not line.startswith("data:"):
+                        continue
+                    data = line[len("data:"):].strip()
+                    if data == "[DONE]":
+                        break
+                    event = json.loads(data)
+                    if event.get("usage"):
+                        self.last_usage = event["usage"]
+                    choices = event.get("choices") or [{}]
+                    delta = choices[0].get("delta", {}).get("content")
+                    if delta:
+                        if not received:
+                            details["first_token_ms"] = round((time.perf_counter() - started) * 1000, 2)
+                        received.append(delta)
+                        yield delta
+            finally:
+                response.close()
+                if self.last_usage:
+                    telemetry.record_usage(self.last_usage, self.model)
+                else:
+                    telemetry.record_usage({
+                        "prompt_tokens": compaction.estimate_tokens(json.dumps(messages)),
+                        "completion_tokens": compaction.estimate_tokens("".join(received)),
+                    }, self.model, source="estimate")
+                details.update(self.last_usage or {})
+
+    def _post(self, headers, payload, stream=False):
+        import requests
+
+        for attempt in range(self.max_retries + 1):
+            self.rate_limiter.acquire()
+            try:
+                response = self.session.post(
+                    FIREWORKS_CHAT_URL, headers=headers, json=payload, timeout=self.timeout, stream=stream
+                )
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt == self.max_retries:
+                    raise
+                telemetry.llm_retries.inc(reason=type(e).__name__)
+                time.sleep(retry_delay(None, attempt))
+                continue
+            if response.status_code in RETRYABLE_STATUS_CODES and attempt < self.max_retries:
+                delay = retry_delay(response, attempt)
+                if delay is not None:
+                    telemetry.llm_retries.inc(reason=str(response.status_code))
+                    response.close()
+                    time.sleep(delay)
+                    continue
+            response.raise_for_status()
+            return response
+
+def send_simple_confirmation_email(to_email, company_name, role, sender_email, sender_password):
+    subject = f"Selection Confirmation - {role} at {company_name}"
+    body = f"""Hello,
+
+Congratulations! You've been selected for the {role.replace('_', ' ').title()} position at {company_name}.
+We will share the interview details with you soon.
+
+Best,
+From Team
+"""
+    return send_email(sender_email, sender_password, to_email, subject, body)
+
+def send_interview_email(to_email, company_name, role, sender_email, sender_password, interview_datetime_ist, candidate_email, zoom_join_url):
+    subject = f"Interview Scheduled - {role.replace('_', ' ').title()} at {company_name}"
+    ist_time = interview_datetime_ist.strftime('%Y-%m-%d %H:%M IST')
+    est_time = (interview_datetime_ist.astimezone(pytz.timezone('US/Eastern'))).strftime('%Y-%m-%d %H:%M EST')
+
+    body = f"""Hello,
+
+We're excited to confirm your interview for the {role.replace('_', ' ').title()} position at {company_name}. Please find the details below:
+
+------------------------------------------------------------
+Meeting Details
+
+Title: {role.replace('_', ' ').title()} Technical Interview
+Date: {interview_datetime_ist.strftime('%Y-%m-%d')}
+Time: {ist_time} (Indian Standard Time) / {est_time} (Eastern Standard Time)
+Duration: 60 minutes
+Attendee: {candidate_email}
+
+Location: Zoom Meeting
+Zoom Link: {zoom_join_url}
+
+Description: This meeting is a technical interview for the {role.replace('_', ' ').title()} position. Please ensure you have access to Zoom and a reliable internet connection prior to the meeting. 
+
+We recommend joining the meeting 5 minutes early to address any potential connectivity issues and to be all set for the interview.
+
+Time Zone Information:
+- IST is UTC+5:30
+- EST is UTC-5:00
+
+For your convenience, you can convert the meeting time to your local time using this time zone converter: https://www.timeanddate.com/worldclock/converter.html
+
+Prepare well and be confident—you got this! If you have any questions or preferences, feel free to let us know.
+
+Best,
+From Team
+------------------------------------------------------------
+"""
+    return send_email(sender_email, sender_password, to_email, subject, body)
+
+def send_rejection_email(to_email, role, company_name, feedback, sender_email, sender_password):
+    subject = f"Your Application for {role.replace('_', ' ').title()} at {company_name}"
+    body = f"""Hi,
+
+Thank you so much for your interest in the {role.replace('_', ' ').title()} position at {company_name}. We truly appreciate the time you took to apply and we're excited to consider your application.
+
+{feedback}
+
+We encourage you to continue upskilling in these areas and try again in the future. Some useful resources to get you started include:
+1. Coursera and edx have a wide range of courses on backend/frontend/ai-ml technologies.
+2. Platforms like Udemy offer valuable tutorials on kubernetes, docker, and more.
+3. Consider checking out documentation and free resources on dev.to that cover various ci/cd practices.
+
+Keep pushing forward; your experience is an excellent foundation to build upon.
+
+Best Regards,
+From team
+"""
+    return send_email(sender_email, sender_password, to_email, subject, body)
+
+def send_email(sender_email, sender_password, to_email, subject, body):
+    import mailer
+
+    msg = mailer.build_message(sender_email, to_email, subject, body)
+    try:
+        mailer.get_pool(sender_email, sender_password).send(msg)
+        return True
+    except Exception as e:
+        logger.error(f"Failed to send email: {e}")
+        return False
+
+def send_emails_bulk(sender_email, sender_password, emails: List[Tuple[str, str, str]]) -> List[Dict]:
+    """Send (to_email, subject, body) triples over pooled SMTP sessions; returns per-message outcomes."""
+    import mailer
+
+    messages = [mailer.build_message(sender_email, to_email, subject, body) for to_email, subject, body in emails]
+    return mailer.send_bulk(mailer.get_pool(sender_email, sender_password), messages)
+
+def get_zoom_access_token(account_id, client_id, client_secret):
+    try:
+        return zoom_tokens.token_cache.get(account_id, client_id, client_secret)
+    except Exception as e:
+        logger.error(f"Failed to get Zoom access token: {e}")
+        return None
+
+def schedule_zoom_meeting(access_token, topic, start_time, duration_minutes=60, timezone="Asia/Kolkata"):
+    url = f"{ZOOM_API_URL}/users/me/meetings"
+    headers = {
+        "Authorization": f"Bearer {access_token}",
+        "Content-Type": "application/json"
+    }
+    payload = {
+        "topic": topic,
+        "type": 2,
+        "start_time": start_time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "duration": duration_minutes,
+        "timezone": timezone,
+        "agenda": topic,
+        "settings": {
+            "join_before_host": True,
+            "waiting_room": False
+        }
+    }
+    try:
+        with telemetry.span("zoom_meeting"):
+            # Bounded, so a hung Zoom call cannot hold a job worker (and its renewed lease) forever.
+            response = get_http_session().post(url, headers=headers, json=payload,
+                                               timeout=zoom_tokens.ZOOM_TOKEN_TIMEOUT)
+            if response.status_code == 401:
+                zoom_tokens.token_cache.discard(access_token)
+            response.raise_for_status()
+            meeting_info = response.json()
+        return meeting_info["join_url"]
+    except Exception as e:
+        logger.error(f"Failed to schedule Zoom meeting: {e}")
+        return None
+
+ROLE_REQUIREMENTS: Dict[str, str] = {
+    "AI_ML_Engineer": """
+**Required Skills:**
+- Strong Python programming
+- Experience with ML libraries (PyTorch or TensorFlow)
+- Building and evaluating machine learning models
+- Understanding of deep learning concepts (CNNs, RNNs, transformers)
+- Data cleaning, feature engineering
+- Deploying models into production (MLOps tools)
+- Familiarity with prompt engineering and LLMs
+""",
+    "Frontend_Engineer": """
+**Required Skills:**
+- Proficient in React.js, Vue.js, or Angular
+- HTML5, CSS3, and modern JavaScript/TypeScript
+- Building responsive, cross-browser web apps
+- State management (Redux, Pinia, or Context API)
+- Frontend testing (Jest, React Testing Library)
+- API integration and UI optimization
+""",
+    "Backend_Engineer": """
+**Required Skills:**
+- Python, Node.js, or Java backend development
+- REST API & microservices design
+- Database schema design (SQL and NoSQL)
+- Authentication, security, and data validation
+- Cloud deployment (AWS, GCP, or Azure)
+- CI/CD pipelines and Docker
+""",
+    "Web_Developer": """
+**Required Skills:**
+- HTML5, CSS3, and modern JavaScript
+- Experience with at least one JS framework (React, Vue, or Angular)
+- Responsive layout & cross-browser compatibility
+- Consuming APIs and AJAX/Fetch/GraphQL
+- Basic backend (Node.js, Python, or PHP) is a plus
+- Version control (Git)
+""",
+    "Web_Designer": """
+**Required Skills:**
+- UI/UX fundamentals for web and mobile
+- Proficient in Figma, Adobe XD, or Sketch
+- HTML/CSS for rapid prototyping
+- Creating wireframes and mockups
+- Understanding color, typography, and layout
+- Handoff to developers
+""",
+    "JavaScript_Developer": """
+**Required Skills:**
+- Advanced JavaScript (ES6+)
+- DOM manipulation, events, and browser APIs
+- Working with Node.js and npm
+- Building SPAs with frameworks (React, Vue, Angular)
+- Asynchronous programming (Promises, async/await)
+- Unit testing and debugging
+""",
+    "Full_Stack_Engineer": """
+**Required Skills:**
+- Proficient in both frontend (React, Vue, Angular) and backend (Node.js, Python, Java) technologies
+- REST API and database design
+- Authentication and security best practices
+- Deploying full stack apps (Vercel, Netlify, Heroku, or AWS)
+- Git and CI/CD workflows
+- Understanding of DevOps and Docker is a plus
+""",
+    "UI_Developer": """
+**Required Skills:**
+- Expert in HTML5, CSS3 (Flexbox, Grid)
+- CSS preprocessors (Sass/Less) and frameworks (Bootstrap, Tailwind)
+- Building pixel-perfect, accessible UIs
+- Animation with CSS or JS libraries (GSAP, Framer Motion)
+- Optimizing for performance and mobile
+"""
+}
+
+class AnalysisCache:
+    """SQLite-backed store of parsed Dobby verdicts, keyed by a hash of everything that shapes the prompt."""
+
+    def __init__(self, path: str, ttl: float = ANALYSIS_CACHE_TTL, max_entries: int = ANALYSIS_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS analyses ("
+            "key TEXT PRIMARY KEY, result TEXT NOT NULL, created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS analyses_accessed_at ON analyses (accessed_at)")
+        self.conn.commit()
+
+    @staticmethod
+    def make_key(resume_text: str, role, company_name: str, model: str) -> str:
+        """`role` is one role name, or a list of names for a multi-role verdict."""
+        if isinstance(role, str):
+            requirements = ROLE_REQUIREMENTS[role]
+        else:
+            role, requirements = list(role), [ROLE_REQUIREMENTS[r] for r in role]
+        material = json.dumps([resume_text, role, requirements, company_name, model])
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def get(self, key: str):
+        now = time.time()
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT result FROM analyses WHERE key = ? AND created_at > ?", (key, now - self.ttl)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.conn.execute("UPDATE analyses SET accessed_at = ? WHERE key = ?", (now, key))
+            self.conn.commit()
+        return json.loads(row[0])
+
+    def put(self, key: str, result: Dict) -> None:
+        now = time.time()
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO analyses (key, result, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(result), now, now)
+            )
+            self._evict(now)
+            self.conn.commit()
+
+    def _evict(self, now: float) -> None:
+        self.conn.execute("DELETE FROM analyses WHERE created_at <= ?", (now - self.ttl,))
+        self.conn.execute(
+            "DELETE FROM analyses WHERE key IN ("
+            "SELECT key FROM analyses ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)", (self.max_entries,)
+        )
+
+    def stats(self) -> Dict[str, int]:
+        with self.lock:
+            entries = self.conn.execute("SELECT COUNT(*) FROM analyses").fetchone()[0]
+        return {"hits": self.hits, "misses": self.misses, "entries": entries}
+
+@shared_resource
+def get_analysis_cache() -> AnalysisCache:
+    cache = AnalysisCache(ANALYSIS_CACHE_PATH)
+    telemetry.register_gauge("dobby_analysis_cache_hits", "Analysis cache hits since start.", lambda: cache.hits)
+    telemetry.register_gauge("dobby_analysis_cache_misses", "Analysis cache misses since start.", lambda: cache.misses)
+    return cache
+
+_SELECTED_PATTERN = re.compile(r'"selected"\s*:\s*(true|false)')
+_FEEDBACK_PATTERN = re.compile(r'"feedback"\s*:\s*"((?:[^"\\]|\\.)*)(")?')
+
+def partial_verdict(text: str) -> Dict:
+    """Pull `selected` and the (possibly unfinished) `feedback` string out of an incomplete JSON reply."""
+    verdict = {}
+    selected = _SELECTED_PATTERN.search(text)
+    if selected:
+        verdict["selected"] = selected.group(1) == "true"
+    feedback = _FEEDBACK_PATTERN.search(text)
+    if feedback:
+        raw = feedback.group(1)
+        try:
+            verdict["feedback"] = json.loads(f'"{raw}"')
+        except ValueError:
+            verdict["feedback"] = raw
+        verdict["feedback_complete"] = feedback.group(2) is not None
+    return verdict
+
+VERDICT_RESPONSE_FORMAT = """{
+  "selected": true/false,
+  "feedback": "Explain your decision concisely.",
+  "matching_skills": ["skill1", "skill2"],
+  "missing_skills": ["skill3", "skill4"],
+  "experience_level": "junior/mid/senior"
+}"""
+
+TRIAGE_RESPONSE_FORMAT = """{
+  "selected": true/false,
+  "confidence": 0.0-1.0 (how sure you are that an expert recruiter would make the same decision),
+  "feedback": "Explain your decision concisely.",
+  "matching_skills": ["skill1", "skill2"],
+  "missing_skills": ["skill3", "skill4"],
+  "experience_level": "junior/mid/senior"
+}"""
+
+MULTI_ROLE_RESPONSE_FORMAT = """{
+  "roles": {
+    "<role name>": {
+      "selected": true/false,
+      "feedback": "Explain your decision concisely.",
+      "matching_skills": ["skill1", "skill2"],
+      "missing_skills": ["skill3", "skill4"],
+      "experience_level": "junior/mid/senior"
+    }
+  }
+}"""
+
+def build_analysis_messages(resume_text: str, role: str, company_name: str,
+                            response_format: str = VERDICT_RESPONSE_FORMAT) -> List[Dict[str, str]]:
+    system_message = (
+        f"You are an expert technical recruiter for {company_name}. "
+        "Analyze resumes for technical roles and decide if a candidate should be selected."
+    )
+    prompt = f"""Analyze this resume for the "{role.replace("_", " ")}" position using the requirements below and return your response in valid JSON:
+
+{ROLE_REQUIREMENTS[role]}
+
+Resume:
+{resume_text}
+
+Response format (JSON only, no markdown, no extra text!):
+{response_format}
+"""
+    return [{"role": "system", "content": system_message},
+            {"role": "user", "content": prompt}]
+
+def routing_signature(router_model: str = ROUTER_MODEL, min_confidence: float = ROUTER_MIN_CONFIDENCE) -> str:
+    """What decides a single-role verdict; part of the analysis cache key so a tier change is a cache miss."""
+    return f"{router_model}>{DOBBY_MODEL}@{min_confidence:g}" if router_model else DOBBY_MODEL
+
+def triage_resume(resume_text: str, role: str, api_key: str, company_name: str,
+                  model: str = ROUTER_MODEL) -> Optional[Dict]:
+    """The small model's verdict with a `confidence`, or None when it gives no usable answer."""
+    chat = DobbyChat(api_key, model=model)
+    messages = build_analysis_messages(resume_text, role, company_name, TRIAGE_RESPONSE_FORMAT)
+    try:
+        result_text = chat.chat(messages, max_tokens=ROUTER_MAX_TOKENS, temperature=0)
+        with telemetry.span("json_parse", model=model):
+            return structured_output.parse_with_repair(
+                result_text, structured_output.validate_triage, TRIAGE_RESPONSE_FORMAT, chat.chat
+            )
+    except Exception as e:
+        logger.warning(f"Routing model gave no usable verdict, escalating: {str(e)}")
+        return None
+
+def analyze_with_dobby(resume_text: str, role: str, api_key: str, company_name: str,
+                       on_progress: Optional[Callable[[Dict], None]] = None) -> Dict:
+    """A verdict from the 70B model alone, uncached; raises when the reply cannot be parsed."""
+    dobby = DobbyChat(api_key)
+    messages = build_analysis_messages(resume_text, role, company_name)
+    if on_progress is None:
+        result_text = dobby.chat(messages)
+    else:
+        chunks = []
+        extractor = structured_output.IncrementalJsonExtractor()
+        for delta in dobby.chat_stream(messages):
+            chunks.append(delta)
+            on_progress(partial_verdict("".join(chunks)))
+            if extractor.feed(delta):
+                break
+        result_text = "".join(chunks)
+    try:
+        with telemetry.span("json_parse"):
+            return structured_output.parse_with_repair(
+                result_text, structured_output.validate_verdict, VERDICT_RESPONSE_FORMAT, dobby.chat
+            )
+    except Exception:
+        logger.warning(f"Unparseable reply from Dobby 70B:\n{result_text}")
+        raise
+
+def analyze_resume_dobby_full(resume_text: str, role: str, api_key: str, company_name: str,
+                              on_progress: Optional[Callable[[Dict], None]] = None) -> Dict:
+    """Return the complete parsed verdict, serving repeat screenings from the analysis cache.
+
+    With a routing model configured, its verdict stands when its confidence reaches
+    `ROUTER_MIN_CONFIDENCE`; anything less is escalated to the 70B model. The verdict's
+    `tier` says which model decided.
+
+    When `on_progress` is given the completion is streamed and the callback receives
+    `partial_verdict` of the text received so far after every chunk.
+    """
+    resume_text = compaction.compact_resume(resume_text).text
+    cache = get_analysis_cache()
+    cache_key = AnalysisCache.make_key(resume_text, role, company_name, routing_signature())
+    cached = cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    triage = triage_resume(resume_text, role, api_key, company_name) if ROUTER_MODEL else None
+    if triage is not None and triage["confidence"] >= ROUTER_MIN_CONFIDENCE:
+        result = {**triage, "tier": "router", "model": ROUTER_MODEL}
+        if on_progress is not None:
+            on_progress({"selected": result["selected"], "feedback": result["feedback"], "feedback_complete": True})
+    else:
+        try:
+            result = analyze_with_dobby(resume_text, role, api_key, company_name, on_progress)
+        except Exception as e:
+            logger.error(f"Error processing response from Dobby 70B: {str(e)}")
+            return {"selected": False, "feedback": f"Error analyzing resume: {str(e)}"}
+        result.update(tier="70b", model=DOBBY_MODEL)
+        if triage is not None:
+            result["router_confidence"] = triage["confidence"]
+            result["router_selected"] = triage["selected"]
+    telemetry.screenings.inc(mode="single_role")
+    telemetry.routing.inc(tier=result["tier"], escalated=str(bool(ROUTER_MODEL) and result["tier"] == "70b").lower())
+    cache.put(cache_key, result)
+    return result
+
+MULTI_ROLE_TOKENS_PER_ROLE = 320
+
+def build_multi_role_messages(resume_text: str, roles: List[str], company_name: str) -> List[Dict[str, str]]:
+    """Put everything that is identical across candidates first so provider-side prefix caching applies."""
+    requirements = "\n".join(
+        f"### {role}\n{ROLE_REQUIREMENTS[role].strip()}\n" for role in roles
+    )
+    system_message = (
+        f"You are an expert technical recruiter for {company_name}. "
+        "Analyze resumes for technical roles and decide, independently for every role listed, "
+        "whether the candidate should be selected.\n\n"
+        f"Roles and requirements:\n\n{requirements}\n"
+        "Response format (JSON only, no markdown, no extra text!), with one entry under \"roles\" "
+        f"for each of: {', '.join(roles)}\n{MULTI_ROLE_RESPONSE_FORMAT}\n"
+    )
+    return [{"role": "system", "content": system_message},
+            {"role": "user", "content": f"Resume:\n{resume_text}"}]
+
+def analyze_resume_multi_role(resume_text: str, roles: List[str], api_key: str, company_name: str) -> Dict[str, Dict]:
+    """Evaluate one resume against several roles in a single call; returns a verdict dict per role."""
+    roles = [role for role in ROLE_REQUIREMENTS if role in roles]
+    resume_text = compaction.compact_resume(resume_text).text
+    cache = get_analysis_cache()
+    cache_key = AnalysisCache.make_key(resume_text, roles, company_name, DOBBY_MODEL)
+    cached = cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    dobby = DobbyChat(api_key)
+    messages = build_multi_role_messages(resume_text, roles, company_name)
+    try:
+        result_text = dobby.chat(messages, max_tokens=256 + MULTI_ROLE_TOKENS_PER_ROLE * len(roles))
+        with telemetry.span("json_parse", roles=len(roles)):
+            verdicts = structured_output.parse_with_repair(
+                result_text, lambda data: structured_output.validate_multi_role(data, roles),
+                MULTI_ROLE_RESPONSE_FORMAT, dobby.chat
+            )
+    except Exception as e:
+        logger.error(f"Error processing response from Dobby 70B: {str(e)}\n\nRaw: {result_text if 'result_text' in locals() else ''}")
+        return {role: {"selected": False, "feedback": f"Error analyzing resume: {str(e)}"} for role in roles}
+    telemetry.screenings.inc(mode="multi_role")
+    cache.put(cache_key, verdicts)
+    return verdicts
+
+def analyze_resume_dobby(resume_text: str, role: str, api_key: str, company_name: str) -> Tuple[bool, str]:
+    result = analyze_resume_dobby_full(resume_text, role, api_key, company_name)
+    return result["selected"], result["feedback"]
+
+def extract_text_from_pdf(pdf_file) -> str:
+    import pdf_extraction
+
+    try:
+        if isinstance(pdf_file, bytes):
+            data = pdf_file
+        else:
+            data = pdf_file.getvalue() if hasattr(pdf_file, "getvalue") else pdf_file.read()
+        with telemetry.span("pdf_extraction", bytes=len(data)):
+            return pdf_extraction.extract_text(data)
+    except Exception as e:
+        logger.error(f"Error extracting PDF text: {str(e)}")
+        return ""
+
+def no_text_feedback() -> str:
+    import ocr
+
+    if ocr.available():
+        return "Could not extract text from the PDF, even with OCR."
+    return "Could not extract text from the PDF. If it is a scan, install Tesseract to enable OCR."
+
+def _pdfs_from_zip(data: bytes) -> List[Tuple[str, bytes]]:
+    """The PDFs in a zip archive; entries over PDF_MAX_BYTES are reported and skipped before decompression."""
+    import pdf_extraction
+
+    pdfs = []
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        for info in archive.infolist():
+            name = os.path.basename(info.filename)
+            if info.is_dir() or not name.lower().endswith(".pdf") or name.startswith("._"):
+                continue
+            if info.file_size > pdf_extraction.PDF_MAX_BYTES:
+                logger.error(f"Skipped {name} in the zip archive: {info.file_size // 1024} KB is above the "
+                             f"{pdf_extraction.PDF_MAX_BYTES // 1024} KB limit")
+                continue
+            # A header understating the size cannot blow past it: reads stop at file_size and fail the CRC check.
+            pdfs.append((name, archive.read(info)))
+    return pdfs
+
+def collect_batch_files(uploaded_files, folder_path: str = "") -> List[Tuple[str, bytes]]:
+    """Expand uploaded PDFs, zip archives and an optional server-side folder into (name, bytes) pairs."""
+    batch = []
+    for uploaded in uploaded_files or []:
+        data = uploaded.getvalue()
+        if uploaded.name.lower().endswith(".zip"):
+            batch.extend(_pdfs_from_zip(data))
+        else:
+            batch.append((uploaded.name, data))
+    if folder_path:
+        for name in sorted(os.listdir(folder_path)):
+            path = os.path.join(folder_path, name)
+            if os.path.isfile(path) and name.lower().endswith(".pdf"):
+                with open(path, "rb") as f:
+                    batch.append((name, f.read()))
+    return batch
+
+def batch_row(name: str, result: Dict, match: float, started: float, tokens_saved: int = 0) -> Dict:
+    return {
+        "File": name,
+        "Selected": bool(result["selected"]),
+        "Skill Match": round(float(match), 2),
+        "Experience": result.get("experience_level", ""),
+        "Matching Skills": ", ".join(result.get("matching_skills", [])),
+        "Missing Skills": ", ".join(result.get("missing_skills", [])),
+        "Feedback": result["feedback"],
+        "Tier": result.get("tier", ""),
+        "Tokens Saved": tokens_saved,
+        "Seconds": round(time.perf_counter() - started, 2),
+    }
+
+def screen_resume_text(name: str, resume_text: str, match: float, role: str, api_key: str, company_name: str) -> Dict:
+    started = time.perf_counter()
+    with telemetry.trace(source=name, role=role):
+        result = analyze_resume_dobby_full(resume_text, role, api_key, company_name)
+    record_analysis(candidate_store.candidate_key("", role, company_name, resume_text), "", role, company_name,
+                    name, resume_text, result)
+    return batch_row(name, result, match, started, compaction.compact_resume(resume_text).tokens_saved)
+
+def filter_out_resume(name: str, resume_text: str, match: float, role: str, company_name: str, started: float) -> Dict:
+    feedback = f"Filtered out locally: {match:.0%} of the role's requirements matched."
+    get_candidate_store().save(
+        candidate_store.candidate_key("", role, company_name, resume_text), role=role, company=company_name,
+        source=name, resume_text=resume_text, status=candidate_store.FILTERED,
+        analysis={"selected": False, "feedback": feedback, "skill_match": round(float(match), 2)}
+    )
+    return batch_row(name, {"selected": False, "feedback": feedback}, match, started)
+
+def screen_resumes_batch(files: List[Tuple[str, bytes]], role: str, api_key: str, company_name: str,
+                         max_workers: int = DEFAULT_BATCH_CONCURRENCY,
+                         min_score: Optional[float] = prefilter.PREFILTER_MIN_SCORE,
+                         top_k: Optional[int] = None) -> Iterator[Dict]:
+    """Screen resumes on a bounded thread pool, yielding each result as soon as it finishes.
+
+    All resumes are extracted and scored locally first; only those passing `min_score`
+    (and within the best `top_k`, when given) are sent to Dobby.
+    """
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        started = time.perf_counter()
+        texts = list(pool.map(extract_text_from_pdf, [data for _, data in files]))
+        scores = prefilter.RoleMatcher(ROLE_REQUIREMENTS[role]).score(texts)
+        send_to_llm = prefilter.select_for_llm(scores, min_score, top_k)
+        futures = []
+        for (name, _), text, match, keep in zip(files, texts, scores["coverage"], send_to_llm):
+            if not text:
+                yield batch_row(name, {"selected": False, "feedback": no_text_feedback()}, 0, started)
+            elif not keep:
+                yield filter_out_resume(name, text, match, role, company_name, started)
+            else:
+                futures.append(pool.submit(screen_resume_text, name, text, match, role, api_key, company_name))
+        for future in as_completed(futures):
+            yield future.result()
+
+def run_screen_resume_job(payload: Dict) -> Dict:
+    """Extract, pre-filter and screen one resume sent as base64 PDF bytes; returns its batch row.
+
+    `top_k` needs the whole batch at once, so queued screening only applies `min_score`.
+    """
+    started = time.perf_counter()
+    name, role, company_name = payload["source"], payload["role"], payload["company_name"]
+    text = extract_text_from_pdf(base64.b64decode(payload["pdf"]))
+    if not text:
+        return batch_row(name, {"selected": False, "feedback": no_text_feedback()}, 0, started)
+    match = float(prefilter.RoleMatcher(ROLE_REQUIREMENTS[role]).score([text])["coverage"][0])
+    min_score = payload.get("min_score")
+    if min_score is not None and match < min_score:
+        return filter_out_resume(name, text, match, role, company_name, started)
+    return screen_resume_text(name, text, match, role, payload["api_key"], company_name)
+
+def enqueue_screening(files: List[Tuple[str, bytes]], role: str, tenant: str, company_name: str,
+                      min_score: Optional[float] = prefilter.PREFILTER_MIN_SCORE) -> List[str]:
+    """Queue one screening job per resume for the tenant's workers; returns the job ids in file order.
+
+    Raises RuntimeError when no live worker.py process could run them.
+    """
+    queue = get_job_queue()
+    if not queue.live_workers("screen_resume"):
+        raise RuntimeError("No screening worker is running; start one with `python worker.py`.")
+    return [
+        queue.enqueue(
+            "screen_resume",
+            {"source": name, "role": role, "company_name": company_name, "min_score": min_score, "tenant": tenant,
+             "pdf": base64.b64encode(data).decode("ascii")},
+            idempotency_key=f"{tenant}:{role}:screen:{min_score}:{hashlib.sha256(data).hexdigest()}", tenant=tenant
+        )
+        for name, data in files
+    ]
+
+def screening_results(job_sources: Dict[str, str], idle_timeout: float = SCREENING_IDLE_TIMEOUT) -> Iterator[Dict]:
+    """Yield the batch row of each queued screening job (job id -> file name) as soon as it finishes.
+
+    When every screening worker has gone, or no job has started or finished for `idle_timeout`
+    seconds, the jobs still pending are given up on with a "no worker picked this up" row.
+    """
+    queue = get_job_queue()
+    started = time.perf_counter()
+    pending = dict(job_sources)
+    seen: Dict[str, Tuple[str, Optional[str]]] = {}
+    progressed = time.monotonic()
+    while pending:
+        for job_id, name in list(pending.items()):
+            job = queue.get(job_id)
+            if job is None or job["status"] == jobs.FAILED:
+                del pending[job_id]
+                progressed = time.monotonic()
+                error = job["error"] if job else "the job was deleted"
+                yield batch_row(name, {"selected": False, "feedback": f"Screening failed: {error}"}, 0, started)
+            elif job["status"] == jobs.SUCCEEDED:
+                del pending[job_id]
+                progressed = time.monotonic()
+                yield job["result"]
+            elif seen.get(job_id) != (job["status"], job["worker"]):
+                seen[job_id] = (job["status"], job["worker"])
+                progressed = time.monotonic()
+        if not pending:
+            break
+        if not queue.live_workers("screen_resume") or time.monotonic() - progressed > idle_timeout:
+            for name in pending.values():
+                yield batch_row(name, {"selected": False, "feedback": "No screening worker picked this up; "
+                                       "it stays queued and will run when a worker is available."}, 0, started)
+            return
+        time.sleep(jobs.JOB_POLL_INTERVAL)
+
+ZOOM_FALLBACK_URL = "https://zoom.us/j/your_meeting_id_here (failed to auto-schedule - please create manually!)"
+
+def run_confirmation_job(payload: Dict) -> Dict:
+    if not send_simple_confirmation_email(
+        payload["to_email"], payload["company_name"], payload["role"],
+        payload["sender_email"], payload["sender_password"]
+    ):
+        record_outcome(payload, "confirmation_email", sent=False)
+        raise RuntimeError("Confirmation email could not be sent")
+    record_outcome(payload, "confirmation_email", sent=True)
+    return {"sent": True}
+
+def run_rejection_job(payload: Dict) -> Dict:
+    if not send_rejection_email(
+        payload["to_email"], payload["role"], payload["company_name"], payload["feedback"],
+        payload["sender_email"], payload["sender_password"]
+    ):
+        record_outcome(payload, "rejection_email", sent=False)
+        raise RuntimeError("Rejection email could not be sent")
+    record_outcome(payload, "rejection_email", sent=True)
+    return {"sent": True}
+
+def run_interview_schedule_job(payload: Dict) -> Dict:
+    """Create the Zoom meeting, then hand the email off to its own job so a retry never books twice."""
+    meeting_tz = pytz.timezone(payload["meeting_timezone"])
+    start_time = datetime.fromisoformat(payload["interview_time"]).astimezone(meeting_tz)
+    zoom_token = get_zoom_access_token(payload["zoom_account_id"], payload["zoom_client_id"], payload["zoom_client_secret"])
+    zoom_join_url = None
+    if zoom_token:
+        zoom_join_url = schedule_zoom_meeting(
+            zoom_token, payload["topic"], start_time, payload["duration_minutes"], payload["meeting_timezone"]
+        )
+    email_payload = {key: payload[key] for key in ("to_email", "company_name", "role", "interview_time")}
+    email_payload["zoom_join_url"] = zoom_join_url or ZOOM_FALLBACK_URL
+    email_payload["application_key"] = payload["application_key"]
+    record_outcome(payload, "zoom_meeting", status=candidate_store.INTERVIEW_SCHEDULED,
+                   join_url=email_payload["zoom_join_url"], created=bool(zoom_join_url),
+                   start_time=payload["interview_time"])
+    idempotency_key = f"{payload['application_key']}:interview_email"
+    if payload.get("tenant"):
+        email_payload["tenant"] = payload["tenant"]
+        email_job = get_job_queue().enqueue("interview_email", email_payload, idempotency_key, tenant=payload["tenant"])
+    else:
+        email_job = get_job_queue().enqueue(
+            "interview_email", email_payload, idempotency_key,
+            secrets={"sender_email": payload["sender_email"], "sender_password": payload["sender_password"]}
+        )
+    return {"zoom_join_url": zoom_join_url, "email_job": email_job}
+
+def run_interview_email_job(payload: Dict) -> Dict:
+    if not send_interview_email(
+        to_email=payload["to_email"],
+        company_name=payload["company_name"],
+        role=payload["role"],
+        sender_email=payload["sender_email"],
+        sender_password=payload["sender_password"],
+        interview_datetime_ist=datetime.fromisoformat(payload["interview_time"]),
+        candidate_email=payload["to_email"],
+        zoom_join_url=payload["zoom_join_url"]
+    ):
+        record_outcome(payload, "interview_email", sent=False)
+        raise RuntimeError("Interview email could not be sent")
+    record_outcome(payload, "interview_email", sent=True)
+    return {"sent": True}
+
+@shared_resource
+def get_job_queue() -> jobs.JobQueue:
+    return jobs.JobQueue(jobs.JOB_QUEUE_PATH, jobs.JOB_WORKERS, secrets_provider=tenants.tenant_secrets,
+                         tenant_weights=tenants.tenant_weights)
+
+def register_job_handlers() -> None:
+    queue = get_job_queue()
+    queue.register("confirmation_email", run_confirmation_job)
+    queue.register("rejection_email", run_rejection_job)
+    queue.register("interview_schedule", run_interview_schedule_job)
+    queue.register("interview_email", run_interview_email_job)
+
+@shared_resource
+def get_candidate_store() -> candidate_store.CandidateStore:
+    return candidate_store.CandidateStore(candidate_store.CANDIDATE_STORE_PATH)
+
+def record_outcome(payload: Dict, step: str, status: Optional[str] = None, **details) -> None:
+    """Note a side effect's result on the candidate record the job belongs to."""
+    key = payload.get("application_key")
+    if key:
+        get_candidate_store().save(key, status=status, outcomes={step: {**details, "at": time.time()}})
+
+def record_analysis(key: str, email: str, role: str, company_name: str, source: str,
+                    resume_text: str, result: Dict) -> None:
+    get_candidate_store().save(
+        key, email=email, role=role, company=company_name, source=source, resume_text=resume_text,
+        status=candidate_store.SELECTED if result["selected"] else candidate_store.REJECTED,
+        analysis=result, analyzed_at=time.time()
+    )
+
+@shared_resource
+def get_interview_scheduler() -> scheduling.InterviewScheduler:
+    return scheduling.InterviewScheduler(scheduling.INTERVIEW_SLOTS_PATH)
@@ -0,0 +1,126 @@
+"""Local keyword pre-screening of resumes against a role's requirement bullets.
+
+numpy is imported where it is used, so importing this module for its constants stays cheap.
+"""
+from typing import Dict, List, Optional, Set
+import re
+from collections import Counter
+
+PREFILTER_MIN_SCORE = 0.2
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9]+)*")
+_STOPWORDS = {
+    "a", "an", "and", "or", "the", "of", "in", "on", "to", "for", "with", "at", "by", "is", "be", "are", "as",
+    "both", "least", "one", "plus", "into", "strong", "experience", "proficient", "expert", "understanding",
+    "familiarity", "knowledge", "working", "building", "basic", "advanced", "modern", "best", "practices",
+    "design", "concepts", "development", "technologies", "tools", "skills", "required", "using", "creating",
+}
+
+_ALIASES = {
+    "html5": "html", "css3": "css", "nodejs": "node", "reactjs": "react", "vuejs": "vue", "js": "javascript",
+    "ts": "typescript", "k8s": "kubernetes", "tf": "tensorflow",
+    # Requirements name database families; resumes name the products.
+    "postgres": "sql", "postgresql": "sql", "mysql": "sql", "mariadb": "sql", "sqlite": "sql", "mssql": "sql",
+    "mongodb": "nosql", "mongo": "nosql", "dynamodb": "nosql", "cassandra": "nosql", "couchdb": "nosql",
+}
+_SINGULAR_EXCEPTIONS = {"aws", "ios", "kubernetes", "redis", "analysis", "devops", "mlops", "analytics", "less"}
+
+def _singular(token: str) -> str:
+    """Strip a plural "s" so "APIs" matches "API" and "databases" matches "database"."""
+    if len(token) < 3 or token in _SINGULAR_EXCEPTIONS or not token.endswith("s") \
+            or token.endswith(("ss", "us")):
+        return token
+    if token.endswith("ies"):
+        return token[:-3] + "y"
+    return token[:-1]
+
+def _normalize(token: str) -> str:
+    if token.endswith(".js"):
+        token = token[:-3]
+    token = _singular(_ALIASES.get(token, token))
+    return _ALIASES.get(token, token)
+
+def tokenize(text: str) -> List[str]:
+    tokens = (_normalize(token) for token in _TOKEN_PATTERN.findall(text.lower()) if token not in _STOPWORDS)
+    return [token for token in tokens if token not in _STOPWORDS]
+
+def requirement_bullets(requirements: str) -> List[List[str]]:
+    """The distinct terms of each `- ` bullet in a ROLE_REQUIREMENTS entry."""
+    bullets = []
+    for line in requirements.splitlines():
+        line = line.strip()
+        if line.startswith("- "):
+            terms = list(dict.fromkeys(tokenize(line[2:])))
+            if terms:
+                bullets.append(terms)
+    return bullets
+
+def build_inverted_index(token_sets: List[Set[str]], vocabulary: Dict[str, int]) -> Dict[str, "np.ndarray"]:
+    """Map each vocabulary term to the ids of the documents that contain it."""
+    import numpy as np
+
+    postings: Dict[str, List[int]] = {term: [] for term in vocabulary}
+    for doc_id, tokens in enumerate(token_sets):
+        for token in tokens & vocabulary.keys():
+            postings[token].append(doc_id)
+    return {term: np.array(ids, dtype=np.int64) for term, ids in postings.items()}
+
+class RoleMatcher:
+    """Scores resumes by the share of requirement bullets they touch, with TF-IDF similarity alongside."""
+
+    def __init__(self, requirements: str):
+        import numpy as np
+
+        self.bullets = requirement_bullets(requirements)
+        self.vocabulary: Dict[str, int] = {}
+        for terms in self.bullets:
+            for term in terms:
+                self.vocabulary.setdefault(term, len(self.vocabulary))
+        self.bullet_matrix = np.zeros((len(self.vocabulary), len(self.bullets)), dtype=np.float32)
+        for column, terms in enumerate(self.bullets):
+            for term in terms:
+                self.bullet_matrix[self.vocabulary[term], column] = 1.0
+
+    def term_counts(self, resume_texts: List[str]) -> "np.ndarray":
+        import numpy as np
+
+        token_counts = [Counter(tokenize(text)) for text in resume_texts]
+        index = build_inverted_index([set(tokens) for tokens in token_counts], self.vocabulary)
+        counts = np.zeros((len(resume_texts), len(self.vocabulary)), dtype=np.float32)
+        for term, doc_ids in index.items():
+            if doc_ids.size:
+                counts[doc_ids, self.vocabulary[term]] = [token_counts[doc_id][term] for doc_id in doc_ids]
+        return counts
+
+    def score(self, resume_texts: List[str]) -> Dict[str, "np.ndarray"]:
+        """Return `coverage` (0-1 share of bullets matched) and `similarity` (TF-IDF cosine) per resume."""
+        import numpy as np
+
+        if not resume_texts or not self.vocabulary:
+            empty = np.zeros(len(resume_texts), dtype=np.float32)
+            return {"coverage": empty, "similarity": empty}
+        counts = self.term_counts(resume_texts)
+        coverage = ((counts > 0).astype(np.float32) @ self.bullet_matrix > 0).mean(axis=1)
+
+        document_frequency = (counts > 0).sum(axis=0)
+        idf = np.log((1 + len(resume_texts)) / (1 + document_frequency)) + 1
+        tfidf = np.log1p(counts) * idf
+        query = self.bullet_matrix.sum(axis=1) * idf
+        norms = np.linalg.norm(tfidf, axis=1) * np.linalg.norm(query)
+        similarity = np.divide(tfidf @ query, norms, out=np.zeros(len(resume_texts), dtype=np.float32),
+                               where=norms > 0)
+        return {"coverage": coverage, "similarity": similarity}
+
+def select_for_llm(scores: Dict[str, "np.ndarray"], min_score: Optional[float] = PREFILTER_MIN_SCORE,
+                   top_k: Optional[int] = None) -> "np.ndarray":
+    """Boolean mask of resumes worth a full LLM review: coverage at or above `min_score`, capped at the best `top_k`."""
+    import numpy as np
+
+    coverage = scores["coverage"]
+    keep = np.ones(len(coverage), dtype=bool) if min_score is None else coverage >= min_score
+    if top_k is not None and keep.sum() > top_k:
+        ranked = np.lexsort((-scores["similarity"], -coverage))
+        ranked = ranked[keep[ranked]][:top_k]
+        keep = np.zeros(len(coverage), dtype=bool)
+        keep[ranked] = True
+    return keep
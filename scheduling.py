@@ -0,0 +1,197 @@
+"""Interview slot allocation over per-interviewer availability windows without double-booking."""
+from typing import Dict, List, Optional, Tuple
+import os
+import bisect
+import sqlite3
+import threading
+from datetime import datetime, date, timedelta, time as dtime
+
+import pytz
+
+INTERVIEW_SLOTS_PATH = os.environ.get("DOBBY_SLOTS_PATH", ".dobby_slots.sqlite3")
+INTERVIEW_DURATION_MINUTES = 60
+INTERVIEW_BUFFER_MINUTES = 0
+SLOT_STEP_MINUTES = 30
+SCHEDULING_HORIZON_DAYS = 30
+INTERVIEW_MIN_NOTICE_HOURS = 24
+DEFAULT_INTERVIEWERS = "Hiring Team | Asia/Kolkata | Daily 19:00-22:00"
+
+WEEKDAYS = ["mon", "tue", "wed", "thu", "fri", "sat", "sun"]
+
+def _parse_days(spec: str) -> List[int]:
+    spec = spec.strip().lower()
+    if spec in ("daily", "all"):
+        return list(range(7))
+    if spec == "weekdays":
+        return list(range(5))
+    if "-" in spec:
+        first, last = (WEEKDAYS.index(part[:3]) for part in spec.split("-", 1))
+        return [day % 7 for day in range(first, last + 1 if last >= first else last + 8)]
+    return [WEEKDAYS.index(spec[:3])]
+
+def _parse_clock(value: str) -> dtime:
+    hours, minutes = value.strip().split(":")
+    return dtime(int(hours), int(minutes))
+
+class Interviewer:
+    """Someone who runs interviews, with weekly availability in their own time zone."""
+
+    def __init__(self, name: str, timezone: str, windows: List[Tuple[int, dtime, dtime]]):
+        self.name = name
+        self.timezone = timezone
+        self.tz = pytz.timezone(timezone)
+        self.windows = windows
+
+    @classmethod
+    def parse(cls, line: str) -> "Interviewer":
+        """Parse `Name | Time/Zone | Mon-Fri 10:00-18:00; Sat 10:00-13:00`."""
+        name, timezone, availability = (part.strip() for part in line.split("|"))
+        windows = []
+        for block in availability.split(";"):
+            days, hours = block.strip().rsplit(" ", 1)
+            start, end = (_parse_clock(value) for value in hours.split("-"))
+            windows.extend((day, start, end) for day in _parse_days(days))
+        return cls(name, timezone, windows)
+
+    def windows_on(self, day: date) -> List[Tuple[datetime, datetime]]:
+        return sorted(
+            (self.tz.localize(datetime.combine(day, start)), self.tz.localize(datetime.combine(day, end)))
+            for weekday, start, end in self.windows if weekday == day.weekday()
+        )
+
+def parse_interviewers(text: str) -> List[Interviewer]:
+    return [Interviewer.parse(line) for line in text.splitlines() if line.strip()]
+
+class IntervalIndex:
+    """Sorted, non-overlapping intervals with O(log n) conflict lookups."""
+
+    def __init__(self):
+        self.starts: List[datetime] = []
+        self.ends: List[datetime] = []
+
+    def conflict_end(self, start: datetime, end: datetime) -> Optional[datetime]:
+        """Return the end of an interval overlapping [start, end), or None when the range is free."""
+        i = bisect.bisect_right(self.starts, start) - 1
+        if i >= 0 and self.ends[i] > start:
+            return self.ends[i]
+        if i + 1 < len(self.starts) and self.starts[i + 1] < end:
+            return self.ends[i + 1]
+        return None
+
+    def add(self, start: datetime, end: datetime) -> None:
+        i = bisect.bisect_right(self.starts, start)
+        self.starts.insert(i, start)
+        self.ends.insert(i, end)
+
+    def remove(self, start: datetime) -> None:
+        i = bisect.bisect_left(self.starts, start)
+        if i < len(self.starts) and self.starts[i] == start:
+            del self.starts[i]
+            del self.ends[i]
+
+class InterviewScheduler:
+    """Process-wide booking book; every allocation is persisted so restarts keep their calendar."""
+
+    def __init__(self, path: str, duration_minutes: int = INTERVIEW_DURATION_MINUTES,
+                 buffer_minutes: int = INTERVIEW_BUFFER_MINUTES, step_minutes: int = SLOT_STEP_MINUTES,
+                 horizon_days: int = SCHEDULING_HORIZON_DAYS):
+        self.duration = timedelta(minutes=duration_minutes)
+        self.buffer = timedelta(minutes=buffer_minutes)
+        self.step = timedelta(minutes=step_minutes)
+        self.horizon_days = horizon_days
+        self._lock = threading.Lock()
+        self._booked: Dict[str, IntervalIndex] = {}
+        self._by_candidate: Dict[str, Dict] = {}
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS bookings ("
+            "candidate_key TEXT PRIMARY KEY, interviewer TEXT NOT NULL, timezone TEXT NOT NULL, "
+            "start_utc TEXT NOT NULL, end_utc TEXT NOT NULL)"
+        )
+        self.conn.commit()
+        for candidate_key, interviewer, timezone, start, end in self.conn.execute("SELECT * FROM bookings"):
+            self._remember(candidate_key, interviewer, timezone,
+                           datetime.fromisoformat(start), datetime.fromisoformat(end))
+
+    def _remember(self, candidate_key, interviewer, timezone, start, end) -> Dict:
+        booking = {"candidate": candidate_key, "interviewer": interviewer, "timezone": timezone,
+                   "start": start, "end": end}
+        self._booked.setdefault(interviewer, IntervalIndex()).add(start, end)
+        self._by_candidate[candidate_key] = booking
+        return booking
+
+    def _align(self, window_start: datetime, at: datetime) -> datetime:
+        if at <= window_start:
+            return window_start
+        steps = -(-(at - window_start) // self.step)
+        return window_start + steps * self.step
+
+    def next_free(self, interviewer: Interviewer, after: datetime,
+                  horizon_end: Optional[datetime] = None) -> Optional[Tuple[datetime, datetime]]:
+        index = self._booked.get(interviewer.name) or IntervalIndex()
+        first_day = after.astimezone(interviewer.tz).date()
+        last_day = (horizon_end or after + timedelta(days=self.horizon_days)).astimezone(interviewer.tz).date()
+        for offset in range((last_day - first_day).days + 1):
+            for window_start, window_end in interviewer.windows_on(first_day + timedelta(days=offset)):
+                start = self._align(window_start, after)
+                while start + self.duration <= window_end:
+                    blocked_until = index.conflict_end(start - self.buffer, start + self.duration + self.buffer)
+                    if blocked_until is None:
+                        return start.astimezone(pytz.utc), (start + self.duration).astimezone(pytz.utc)
+                    start = self._align(window_start, blocked_until + self.buffer)
+        return None
+
+    def allocate(self, candidate_key: str, interviewers: List[Interviewer],
+                 earliest: Optional[datetime] = None) -> Optional[Dict]:
+        """Book the earliest free slot across interviewers; a candidate keeps the slot they already hold."""
+        bookings = self.allocate_many([candidate_key], interviewers, earliest)
+        return bookings[0]
+
+    def allocate_many(self, candidate_keys: List[str], interviewers: List[Interviewer],
+                      earliest: Optional[datetime] = None) -> List[Optional[Dict]]:
+        earliest = earliest or datetime.now(pytz.utc)
+        bookings = []
+        with self._lock:
+            # Bookings only grow inside the lock, so each interviewer's next free slot never moves earlier:
+            # remember it between candidates and drop interviewers whose horizon is full.
+            horizon_end = earliest + timedelta(days=self.horizon_days)
+            next_slots = {interviewer.name: self.next_free(interviewer, earliest, horizon_end)
+                          for interviewer in interviewers}
+            for candidate_key in candidate_keys:
+                booking = self._by_candidate.get(candidate_key)
+                if booking is None:
+                    options = [(next_slots[interviewer.name], interviewer) for interviewer in interviewers
+                               if next_slots[interviewer.name] is not None]
+                    if options:
+                        (start, end), interviewer = min(options, key=lambda option: option[0][0])
+                        booking = self._remember(candidate_key, interviewer.name, interviewer.timezone, start, end)
+                        self.conn.execute(
+                            "INSERT INTO bookings VALUES (?, ?, ?, ?, ?)",
+                            (candidate_key, interviewer.name, interviewer.timezone, start.isoformat(), end.isoformat())
+                        )
+                        next_slots[interviewer.name] = self.next_free(interviewer, start, horizon_end)
+                bookings.append(booking)
+            self.conn.commit()
+        return bookings
+
+    def release(self, candidate_key: str) -> None:
+        with self._lock:
+            booking = self._by_candidate.pop(candidate_key, None)
+            if booking is None:
+                return
+            self._booked[booking["interviewer"]].remove(booking["start"])
+            self.conn.execute("DELETE FROM bookings WHERE candidate_key = ?", (candidate_key,))
+            self.conn.commit()
+
+def meeting_requests(bookings: List[Dict], topic: str) -> List[Dict]:
+    """Keyword arguments for `schedule_zoom_meeting`, one per booking, in the interviewer's time zone."""
+    requests = []
+    for booking in bookings:
+        tz = pytz.timezone(booking["timezone"])
+        requests.append({
+            "topic": f"{topic} ({booking['interviewer']})",
+            "start_time": booking["start"].astimezone(tz),
+            "duration_minutes": int((booking["end"] - booking["start"]).total_seconds() // 60),
+            "timezone": booking["timezone"],
+        })
+    return requests
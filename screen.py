@@ -0,0 +1,120 @@
+"""Screen resumes from the command line without Streamlit, streaming one JSON line per resume.
+
+    python screen.py --role Backend_Engineer resumes/*.pdf --out results.jsonl
+
+With --tenant the resumes are queued for screening workers (worker.py) instead of screened here.
+"""
+from typing import Dict, Iterator, List, Optional
+import os
+import sys
+import json
+import logging
+import argparse
+
+import jobs
+import ocr
+import pipeline
+import prefilter
+import telemetry
+import tenants
+
+def result_record(row: Dict, role: str) -> Dict:
+    """A batch row with snake_case keys, e.g. "Skill Match" -> "skill_match"."""
+    record = {key.lower().replace(" ", "_"): value for key, value in row.items()}
+    record["role"] = role
+    return record
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("files", nargs="+", help="PDF resumes, zip archives of PDFs, or folders of PDFs")
+    parser.add_argument("--role", required=True, choices=list(pipeline.ROLE_REQUIREMENTS))
+    parser.add_argument("--out", default="-", help="JSONL output file (default: stdout)")
+    parser.add_argument("--company", default=os.environ.get("DOBBY_COMPANY_NAME", ""),
+                        help="Company name used in the prompt (default: $DOBBY_COMPANY_NAME)")
+    parser.add_argument("--api-key", default=os.environ.get("DOBBY_API_KEY", ""),
+                        help="Fireworks API key for Dobby 70B (default: $DOBBY_API_KEY)")
+    parser.add_argument("--concurrency", type=int, default=pipeline.DEFAULT_BATCH_CONCURRENCY,
+                        help="Concurrent Dobby calls")
+    parser.add_argument("--min-score", type=float, default=prefilter.PREFILTER_MIN_SCORE,
+                        help="Minimum local skill match to send a resume to Dobby")
+    parser.add_argument("--top-k", type=int, default=0, help="Send at most this many resumes to Dobby (0 = no limit)")
+    parser.add_argument("--trace-log", default=telemetry.TRACE_LOG_PATH,
+                        help="Append one JSON line per timing span here ('-' for stderr; default: $DOBBY_TRACE_LOG)")
+    parser.add_argument("--metrics", help="Write Prometheus metrics here when the run finishes")
+    parser.add_argument("--tenant", help="Queue the resumes for screening workers under this tenant profile")
+    return parser
+
+class _UploadedPath:
+    """Gives a file on disk the `name`/`getvalue` shape of an uploaded file."""
+
+    def __init__(self, path: str):
+        self.name = os.path.basename(path)
+        self.path = path
+
+    def getvalue(self) -> bytes:
+        with open(self.path, "rb") as f:
+            return f.read()
+
+def queued_rows(files, args) -> Iterator[Dict]:
+    """Queue the resumes for the tenant's workers and yield each batch row as its job finishes."""
+    jobs.JOB_WORKERS = 0
+    company = args.company or tenants.load_profiles()[args.tenant].company_name
+    job_ids = pipeline.enqueue_screening(files, args.role, args.tenant, company, args.min_score)
+    return pipeline.screening_results(dict(zip(job_ids, (name for name, _ in files))))
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(level=logging.WARNING, format="%(levelname)s %(name)s: %(message)s")
+    telemetry.configure_trace_log(args.trace_log)
+    try:
+        ocr.check_required()
+    except RuntimeError as e:
+        print(e, file=sys.stderr)
+        return 2
+    if args.tenant and args.tenant not in tenants.load_profiles():
+        print(f"No tenant profile '{args.tenant}' in {tenants.TENANT_PROFILES_PATH}.", file=sys.stderr)
+        return 2
+    if not args.api_key and not args.tenant:
+        print("No API key: pass --api-key or set DOBBY_API_KEY.", file=sys.stderr)
+        return 2
+
+    files = []
+    for path in args.files:
+        if os.path.isdir(path):
+            files.extend(pipeline.collect_batch_files([], path))
+        elif os.path.isfile(path):
+            files.extend(pipeline.collect_batch_files([_UploadedPath(path)]))
+        else:
+            print(f"Not found: {path}", file=sys.stderr)
+            return 2
+    if not files:
+        print("No PDF resumes found to screen.", file=sys.stderr)
+        return 1
+
+    out = sys.stdout if args.out == "-" else open(args.out, "w", encoding="utf-8")
+    try:
+        if args.tenant:
+            try:
+                rows = queued_rows(files, args)
+            except RuntimeError as e:
+                print(e, file=sys.stderr)
+                return 1
+        else:
+            rows = pipeline.screen_resumes_batch(
+                files, args.role, args.api_key, args.company,
+                max(1, min(args.concurrency, pipeline.MAX_BATCH_CONCURRENCY)), args.min_score, args.top_k or None
+            )
+        for row in rows:
+            out.write(json.dumps(result_record(row, args.role)) + "\n")
+            out.flush()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+        pipeline.get_candidate_store().flush()
+        if args.metrics:
+            with open(args.metrics, "w", encoding="utf-8") as f:
+                f.write(telemetry.render_prometheus())
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,168 @@
+"""Tolerant extraction and validation of the JSON verdicts returned by the model."""
+from typing import Dict, List
+import re
+import json
+
+EXPERIENCE_LEVELS = ("junior", "mid", "senior")
+REPAIR_MAX_TOKENS = 1024
+
+_TRAILING_COMMA = re.compile(r",(\s*[}\]])")
+_PYTHON_LITERALS = re.compile(r"\b(True|False|None)\b")
+_STRING_TOKEN = re.compile(r'("(?:[^"\\]|\\.)*")')
+
+class IncrementalJsonExtractor:
+    """Finds the first top-level JSON object in text that arrives in chunks.
+
+    Anything before the opening brace (a preamble, a ```json fence) and after the
+    matching closing brace is ignored, so a stream can stop as soon as `complete` is set.
+    """
+
+    def __init__(self):
+        self.buffer: List[str] = []
+        self.stack: List[str] = []
+        self.started = False
+        self.complete = False
+        self.in_string = False
+        self.escaped = False
+
+    def feed(self, chunk: str) -> bool:
+        for char in chunk:
+            if self.complete:
+                break
+            if not self.started:
+                if char != "{":
+                    continue
+                self.started = True
+            self.buffer.append(char)
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif char == "\\":
+                    self.escaped = True
+                elif char == '"':
+                    self.in_string = False
+            elif char == '"':
+                self.in_string = True
+            elif char in "{[":
+                self.stack.append("}" if char == "{" else "]")
+            elif char in "}]" and self.stack:
+                self.stack.pop()
+                if not self.stack:
+                    self.complete = True
+        return self.complete
+
+    def text(self) -> str:
+        return "".join(self.buffer)
+
+def _clean_outside_strings(text: str) -> str:
+    """Drop trailing commas and map Python literals to JSON, leaving string contents untouched."""
+    parts = _STRING_TOKEN.split(text)
+    for i in range(0, len(parts), 2):  # even parts lie between string tokens
+        cleaned = _TRAILING_COMMA.sub(r"\1", parts[i])
+        parts[i] = _PYTHON_LITERALS.sub(lambda m: {"True": "true", "False": "false", "None": "null"}[m.group(1)],
+                                        cleaned)
+    return "".join(parts)
+
+def _loads_lenient(text: str):
+    try:
+        return json.loads(text)
+    except ValueError:
+        pass
+    return json.loads(_clean_outside_strings(text))
+
+def extract_json_object(text: str) -> Dict:
+    """Parse the first JSON object in `text`, tolerating fences, chatter and trailing commas.
+
+    A truncated object is rejected rather than closed, so a half-written feedback sentence
+    goes through the repair call instead of being accepted as the verdict.
+    """
+    extractor = IncrementalJsonExtractor()
+    extractor.feed(text)
+    if not extractor.started:
+        raise ValueError("No JSON object found in response")
+    if not extractor.complete:
+        raise ValueError("The JSON object in the response is cut off")
+    return _loads_lenient(extractor.text())
+
+def _as_bool(value) -> bool:
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str) and value.strip().lower() in ("true", "yes", "selected"):
+        return True
+    if isinstance(value, str) and value.strip().lower() in ("false", "no", "rejected"):
+        return False
+    raise ValueError(f"'selected' must be true or false, got {value!r}")
+
+def _as_skill_list(value) -> List[str]:
+    if value is None:
+        return []
+    if isinstance(value, str):
+        return [skill.strip() for skill in value.split(",") if skill.strip()]
+    if isinstance(value, list):
+        return [str(skill) for skill in value]
+    raise ValueError(f"Skill lists must be arrays of strings, got {value!r}")
+
+def validate_verdict(data) -> Dict:
+    """Check one verdict against the response format and normalise loosely typed fields."""
+    if not isinstance(data, dict):
+        raise ValueError("Invalid response format")
+    if "selected" not in data or "feedback" not in data:
+        raise ValueError("Invalid response format")
+    verdict = dict(data)
+    verdict["selected"] = _as_bool(data["selected"])
+    verdict["feedback"] = str(data["feedback"])
+    verdict["matching_skills"] = _as_skill_list(data.get("matching_skills"))
+    verdict["missing_skills"] = _as_skill_list(data.get("missing_skills"))
+    level = str(data.get("experience_level", "")).strip().lower()
+    verdict["experience_level"] = level if level in EXPERIENCE_LEVELS else ""
+    return verdict
+
+def validate_triage(data) -> Dict:
+    """A verdict that must also carry a 0-1 `confidence`, as the routing tier's small model returns."""
+    verdict = validate_verdict(data)
+    try:
+        confidence = float(data.get("confidence"))
+    except (TypeError, ValueError):
+        raise ValueError("Invalid response format: \"confidence\" must be a number from 0 to 1")
+    if 1 < confidence <= 100:  # a percentage
+        confidence /= 100
+    if not 0 <= confidence <= 1:
+        raise ValueError("Invalid response format: \"confidence\" must be a number from 0 to 1")
+    verdict["confidence"] = confidence
+    return verdict
+
+def validate_multi_role(data, roles: List[str]) -> Dict[str, Dict]:
+    if not isinstance(data, dict) or not isinstance(data.get("roles"), dict):
+        raise ValueError("Invalid response format: missing \"roles\" object")
+    verdicts = {}
+    missing = []
+    for role in roles:
+        try:
+            verdicts[role] = validate_verdict(data["roles"].get(role))
+        except ValueError:
+            missing.append(role)
+    if missing:
+        raise ValueError(f"No valid verdict for: {', '.join(missing)}")
+    return verdicts
+
+def repair_messages(raw: str, response_format: str, error: str) -> List[Dict[str, str]]:
+    """A short follow-up asking the model to re-emit its own answer as valid JSON, without re-reading the resume."""
+    return [
+        {"role": "system", "content": "You fix malformed JSON. Reply with a single valid JSON object and nothing else."},
+        {"role": "user", "content": (
+            f"This response could not be used ({error}). Rewrite it as JSON in exactly this format, "
+            f"keeping its decision and wording:\n{response_format}\n\nResponse:\n{raw}"
+        )},
+    ]
+
+def parse_with_repair(raw: str, validate, response_format: str, chat) -> Dict:
+    """Validate `raw`; if that fails, make one cheap JSON-mode repair call through `chat` instead of a re-analysis."""
+    try:
+        return validate(extract_json_object(raw))
+    except ValueError as e:
+        if not raw.strip():
+            raise
+        error = str(e)
+    repaired = chat(repair_messages(raw, response_format, error), max_tokens=REPAIR_MAX_TOKENS,
+                    temperature=0, response_format={"type": "json_object"})
+    return validate(extract_json_object(repaired))
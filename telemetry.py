@@ -0,0 +1,250 @@
+"""In-process timing spans, token usage and Prometheus text exposition for the screening pipeline.
+
+Spans feed a latency histogram per stage and, when DOBBY_TRACE_LOG names a file, one JSON
+line per span. `serve_metrics` exposes everything at /metrics for a Prometheus scraper.
+"""
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+import os
+import json
+import time
+import uuid
+import logging
+import threading
+import contextvars
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+TRACE_LOG_PATH = os.environ.get("DOBBY_TRACE_LOG", "")
+METRICS_PORT = int(os.environ.get("DOBBY_METRICS_PORT", 0))
+PRICE_PER_MILLION_TOKENS = float(os.environ.get("DOBBY_PRICE_PER_MILLION_TOKENS", 0.9))  # USD, Fireworks 70B tier
+# Per-model overrides, e.g. "accounts/fireworks/models/llama-v3p1-8b-instruct=0.2"
+MODEL_PRICES = {
+    model.strip(): float(price)
+    for model, _, price in (item.partition("=") for item in os.environ.get("DOBBY_MODEL_PRICES", "").split(",") if "=" in item)
+}
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+RECENT_SAMPLES = 1024
+RECENT_SPANS = 200
+
+trace_logger = logging.getLogger("dobby.trace")
+trace_logger.propagate = False
+
+_current_trace: contextvars.ContextVar[Optional[Dict]] = contextvars.ContextVar("dobby_trace", default=None)
+
+def _label_key(labels: Dict[str, str]) -> Tuple[Tuple[str, str], ...]:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+def _format_labels(key: Tuple[Tuple[str, str], ...], extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+    pairs = key + extra
+    if not pairs:
+        return ""
+    escaped = (value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+class Counter:
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self._values: Dict[Tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def values(self) -> Dict[Tuple, float]:
+        with self._lock:
+            return dict(self._values)
+
+    def total(self, **labels) -> float:
+        wanted = set(_label_key(labels))
+        return sum(value for key, value in self.values().items() if wanted <= set(key))
+
+    def exposition(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        lines.extend(f"{self.name}{_format_labels(key)} {value:g}" for key, value in sorted(self.values().items()))
+        return lines
+
+class Histogram:
+    """Cumulative-bucket histogram, plus the most recent samples per label set for exact recent percentiles."""
+
+    def __init__(self, name: str, help: str, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.buckets = buckets
+        self._series: Dict[Tuple, Dict] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0,
+                                              "recent": deque(maxlen=RECENT_SAMPLES)}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series["counts"][i] += 1
+            series["sum"] += value
+            series["count"] += 1
+            series["recent"].append(value)
+
+    def snapshot(self) -> Dict[Tuple, Dict]:
+        with self._lock:
+            return {key: {"counts": list(series["counts"]), "sum": series["sum"], "count": series["count"],
+                          "recent": sorted(series["recent"])} for key, series in self._series.items()}
+
+    def exposition(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for key, series in sorted(self.snapshot().items()):
+            for bound, count in zip(self.buckets, series["counts"]):
+                lines.append(f"{self.name}_bucket{_format_labels(key, (('le', f'{bound:g}'),))} {count}")
+            lines.append(f"{self.name}_bucket{_format_labels(key, (('le', '+Inf'),))} {series['count']}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {series['sum']:.6f}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {series['count']}")
+        return lines
+
+stage_seconds = Histogram("dobby_stage_seconds", "Wall time of each pipeline stage.")
+stage_errors = Counter("dobby_stage_errors_total", "Pipeline stages that raised.")
+llm_tokens = Counter("dobby_llm_tokens_total", "Tokens used by chat completions, by kind and source.")
+llm_cost = Counter("dobby_llm_cost_usd_total", "Estimated chat-completion spend in USD.")
+llm_retries = Counter("dobby_llm_retries_total", "Chat requests retried, by HTTP status or error.")
+screenings = Counter("dobby_screenings_total", "Resumes analysed by Dobby (cache hits excluded).")
+routing = Counter("dobby_routing_decisions_total", "Single-role verdicts by the model tier that decided them.")
+METRICS = [stage_seconds, stage_errors, llm_tokens, llm_cost, llm_retries, screenings, routing]
+
+_gauges: Dict[str, Tuple[str, Callable[[], float]]] = {}
+_recent_spans: deque = deque(maxlen=RECENT_SPANS)
+
+def register_gauge(name: str, help: str, read: Callable[[], float]) -> None:
+    """Expose a value computed at scrape time, e.g. a cache size."""
+    _gauges[name] = (help, read)
+
+def configure_trace_log(path: str = TRACE_LOG_PATH) -> None:
+    """Append one JSON object per span to `path` ("-" for stderr); an empty path turns trace logs off."""
+    for handler in list(trace_logger.handlers):
+        trace_logger.removeHandler(handler)
+        handler.close()
+    if path:
+        handler = logging.StreamHandler() if path == "-" else logging.FileHandler(path, encoding="utf-8")
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        trace_logger.addHandler(handler)
+        trace_logger.setLevel(logging.INFO)
+
+@contextmanager
+def trace(**attributes) -> Iterator[Dict]:
+    """Group the spans of one unit of work (one candidate) under a trace id and total its token usage."""
+    current = {"trace_id": uuid.uuid4().hex[:16], "tokens": 0, "cost_usd": 0.0, **attributes}
+    token = _current_trace.set(current)
+    try:
+        yield current
+    finally:
+        _current_trace.reset(token)
+        _emit({"ts": time.time(), "stage": "trace", **current, "cost_usd": round(current["cost_usd"], 6)})
+
+def current_trace() -> Optional[Dict]:
+    return _current_trace.get()
+
+def _emit(record: Dict) -> None:
+    _recent_spans.append(record)
+    if trace_logger.handlers:
+        trace_logger.info(json.dumps(record, default=str))
+
+@contextmanager
+def span(stage: str, **attributes) -> Iterator[Dict]:
+    """Time a pipeline stage. Callers may add attributes to the yielded dict before it closes."""
+    started_at = time.time()
+    started = time.perf_counter()
+    details: Dict = dict(attributes)
+    status = "ok"
+    try:
+        yield details
+    except GeneratorExit:
+        details["closed_early"] = True
+        raise
+    except BaseException as e:
+        status = "error"
+        details.setdefault("error", f"{type(e).__name__}: {e}")
+        stage_errors.inc(stage=stage)
+        raise
+    finally:
+        elapsed = time.perf_counter() - started
+        stage_seconds.observe(elapsed, stage=stage)
+        current = _current_trace.get()
+        record = {"ts": started_at, "stage": stage, "duration_ms": round(elapsed * 1000, 2), "status": status}
+        if current is not None:
+            record["trace_id"] = current["trace_id"]
+        record.update(details)
+        _emit(record)
+
+def record_usage(usage: Optional[Dict], model: str, source: str = "provider") -> None:
+    """Count prompt/completion tokens and their cost; `source` is "estimate" when the provider sent none."""
+    if not usage:
+        return
+    prompt = int(usage.get("prompt_tokens") or 0)
+    completion = int(usage.get("completion_tokens") or 0)
+    llm_tokens.inc(prompt, kind="prompt", model=model, source=source)
+    llm_tokens.inc(completion, kind="completion", model=model, source=source)
+    cost = (prompt + completion) * MODEL_PRICES.get(model, PRICE_PER_MILLION_TOKENS) / 1_000_000
+    llm_cost.inc(cost, model=model)
+    current = _current_trace.get()
+    if current is not None:
+        current["tokens"] += prompt + completion
+        current["cost_usd"] += cost
+
+def recent_spans() -> List[Dict]:
+    return list(_recent_spans)
+
+def stage_summary() -> List[Dict]:
+    """Per stage: count, errors, mean and recent p50/p95/p99 in seconds."""
+    errors = {dict(key).get("stage"): value for key, value in stage_errors.values().items()}
+    rows = []
+    for key, series in sorted(stage_seconds.snapshot().items()):
+        stage = dict(key)["stage"]
+        recent = series["recent"]
+
+        def pct(q: float) -> float:
+            return recent[min(len(recent) - 1, int(q * len(recent)))] if recent else 0.0
+
+        rows.append({"stage": stage, "count": series["count"], "errors": int(errors.get(stage, 0)),
+                     "mean": series["sum"] / series["count"] if series["count"] else 0.0,
+                     "p50": pct(0.50), "p95": pct(0.95), "p99": pct(0.99)})
+    return rows
+
+def render_prometheus() -> str:
+    lines: List[str] = []
+    for metric in METRICS:
+        lines.extend(metric.exposition())
+    for name, (help, read) in sorted(_gauges.items()):
+        try:
+            value = float(read())
+        except Exception:
+            continue
+        lines.extend([f"# HELP {name} {help}", f"# TYPE {name} gauge", f"{name} {value:g}"])
+    return "\n".join(lines) + "\n"
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = render_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def serve_metrics(port: int = METRICS_PORT, host: str = "0.0.0.0") -> ThreadingHTTPServer:
+    """Serve /metrics on a daemon thread; port 0 picks a free port (see `server_address`)."""
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True, name="metrics-server").start()
+    return server
+
+configure_trace_log()
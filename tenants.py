@@ -0,0 +1,72 @@
+"""Per-tenant credential profiles for screening workers, read from a JSON file.
+
+    {"acme": {"company_name": "Acme", "dobby_api_key": "env:ACME_DOBBY_KEY", "weight": 2, ...}}
+
+Any value written as "env:NAME" is read from that environment variable when the profile is
+loaded, so the file itself need not hold secrets. Tenant jobs carry only the tenant name;
+each worker resolves credentials from its own copy of the profiles.
+"""
+from typing import Dict, NamedTuple, Optional
+import os
+import json
+import threading
+
+TENANT_PROFILES_PATH = os.environ.get("DOBBY_TENANTS_PATH", "tenants.json")
+
+class TenantProfile(NamedTuple):
+    name: str
+    company_name: str = ""
+    dobby_api_key: str = ""
+    zoom_account_id: str = ""
+    zoom_client_id: str = ""
+    zoom_client_secret: str = ""
+    email_sender: str = ""
+    email_passkey: str = ""
+    weight: float = 1.0
+
+    def secrets(self) -> Dict[str, str]:
+        """Credentials under the payload keys the job handlers read."""
+        return {
+            "api_key": self.dobby_api_key,
+            "zoom_account_id": self.zoom_account_id,
+            "zoom_client_id": self.zoom_client_id,
+            "zoom_client_secret": self.zoom_client_secret,
+            "sender_email": self.email_sender,
+            "sender_password": self.email_passkey,
+        }
+
+def _resolve(value):
+    if isinstance(value, str) and value.startswith("env:"):
+        return os.environ.get(value[4:], "")
+    return value
+
+_cache: Dict[str, tuple] = {}
+_lock = threading.Lock()
+
+def load_profiles(path: str = TENANT_PROFILES_PATH) -> Dict[str, TenantProfile]:
+    """Profiles by tenant name; re-read whenever the file changes, empty when it does not exist."""
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return {}
+    with _lock:
+        cached = _cache.get(path)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        with open(path, encoding="utf-8") as f:
+            raw = json.load(f)
+        fields = set(TenantProfile._fields) - {"name"}
+        profiles = {
+            name: TenantProfile(name=name, **{key: _resolve(value) for key, value in config.items() if key in fields})
+            for name, config in raw.items()
+        }
+        _cache[path] = (mtime, profiles)
+        return profiles
+
+def tenant_secrets(tenant: str) -> Optional[Dict[str, str]]:
+    """`JobQueue` secrets provider: the tenant's credentials, or None for an unknown tenant."""
+    profile = load_profiles().get(tenant)
+    return profile.secrets() if profile else None
+
+def tenant_weights() -> Dict[str, float]:
+    return {name: float(profile.weight) for name, profile in load_profiles().items()}
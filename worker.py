@@ -0,0 +1,64 @@
+"""Run a stateless screening worker against the shared job queue; start one per core or node.
+
+    DOBBY_JOBS_PATH=/shared/jobs.sqlite3 DOBBY_TENANTS_PATH=tenants.json python worker.py --threads 4
+
+Workers hold no session state: tenant jobs take their credentials from the local tenant
+profiles, and results land in the job queue and the candidate store.
+"""
+from typing import List, Optional
+import sys
+import signal
+import logging
+import argparse
+import threading
+
+import jobs
+import ocr
+import pipeline
+import telemetry
+import tenants
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, default=jobs.JOB_WORKERS, help="Jobs run concurrently by this worker")
+    parser.add_argument("--queue", default=jobs.JOB_QUEUE_PATH, help="Job queue database (default: $DOBBY_JOBS_PATH)")
+    parser.add_argument("--trace-log", default=telemetry.TRACE_LOG_PATH,
+                        help="Append one JSON line per timing span here ('-' for stderr; default: $DOBBY_TRACE_LOG)")
+    parser.add_argument("--metrics-port", type=int, default=telemetry.METRICS_PORT,
+                        help="Serve Prometheus metrics on this port (default: $DOBBY_METRICS_PORT, 0 = off)")
+    return parser
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    telemetry.configure_trace_log(args.trace_log)
+    if args.metrics_port:
+        telemetry.serve_metrics(args.metrics_port)
+    try:
+        ocr.check_required()
+    except RuntimeError as e:
+        print(e, file=sys.stderr)
+        return 2
+    profiles = tenants.load_profiles()
+    if not profiles:
+        logging.getLogger("dobby").warning(
+            f"No tenant profiles at {tenants.TENANT_PROFILES_PATH}; only jobs with in-memory credentials can run."
+        )
+
+    jobs.JOB_QUEUE_PATH, jobs.JOB_WORKERS = args.queue, max(1, args.threads)
+    queue = pipeline.get_job_queue()
+    pipeline.register_job_handlers()
+    # Only dedicated workers screen: the app and screen.py queue these jobs but never claim them.
+    queue.register("screen_resume", pipeline.run_screen_resume_job)
+
+    stopping = threading.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: stopping.set())
+    logging.getLogger("dobby").info(f"Worker {queue.instance_id} serving {', '.join(sorted(profiles)) or 'no tenants'}")
+    stopping.wait()
+    queue.stop()
+    pipeline.get_candidate_store().flush()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,82 @@
+"""Process-wide cache of Zoom Server-to-Server OAuth tokens with single-flight refresh."""
+from typing import Callable, Dict, Tuple
+import os
+import time
+import hashlib
+import threading
+from concurrent.futures import Future
+
+import telemetry
+
+ZOOM_TOKEN_URL = os.environ.get("ZOOM_TOKEN_URL", "https://zoom.us/oauth/token")
+ZOOM_TOKEN_TIMEOUT = (10, 30)
+ZOOM_TOKEN_REFRESH_MARGIN = 300  # seconds before expiry at which a token is renewed
+
+def request_token(account_id: str, client_id: str, client_secret: str) -> Tuple[str, float]:
+    """Fetch a new account-credentials token; returns (access_token, expires_in seconds)."""
+    import requests
+
+    headers = {"Content-Type": "application/x-www-form-urlencoded"}
+    data = {
+        "grant_type": "account_credentials",
+        "account_id": account_id
+    }
+    with telemetry.span("zoom_token_fetch"):
+        response = requests.post(ZOOM_TOKEN_URL, headers=headers, data=data, auth=(client_id, client_secret),
+                                 timeout=ZOOM_TOKEN_TIMEOUT)
+        response.raise_for_status()
+        token_info = response.json()
+    return token_info["access_token"], float(token_info.get("expires_in", 3600))
+
+class ZoomTokenCache:
+    """Tokens are keyed by account, client ID and a digest of the secret.
+
+    Concurrent callers that find no fresh token share one in-flight request.
+    """
+
+    def __init__(self, fetch: Callable[[str, str, str], Tuple[str, float]] = request_token,
+                 refresh_margin: float = ZOOM_TOKEN_REFRESH_MARGIN):
+        self.fetch = fetch
+        self.refresh_margin = refresh_margin
+        self.fetches = 0
+        self._tokens: Dict[Tuple[str, str, str], Tuple[str, float]] = {}
+        self._inflight: Dict[Tuple[str, str, str], Future] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(account_id: str, client_id: str, client_secret: str) -> Tuple[str, str, str]:
+        return account_id, client_id, hashlib.sha256(client_secret.encode("utf-8")).hexdigest()
+
+    def get(self, account_id: str, client_id: str, client_secret: str) -> str:
+        key = self._key(account_id, client_id, client_secret)
+        with self._lock:
+            cached = self._tokens.get(key)
+            if cached is not None and cached[1] - self.refresh_margin > time.monotonic():
+                return cached[0]
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+        if not leader:
+            return future.result()
+        try:
+            token, expires_in = self.fetch(account_id, client_id, client_secret)
+            with self._lock:
+                self.fetches += 1
+                self._tokens[key] = (token, time.monotonic() + expires_in)
+            future.set_result(token)
+            return token
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def discard(self, token: str) -> None:
+        """Forget a token the API rejected so the next `get` fetches a new one."""
+        with self._lock:
+            for key in [k for k, (cached, _) in self._tokens.items() if cached == token]:
+                del self._tokens[key]
+
+token_cache = ZoomTokenCache()